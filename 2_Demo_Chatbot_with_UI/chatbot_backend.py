@@ -1,21 +1,59 @@
 from langchain_ollama import ChatOllama
 from langchain_core.chat_history import InMemoryChatMessageHistory
 from langchain_core.runnables.history import RunnableWithMessageHistory
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from typing import Any
+from functools import lru_cache
 
-store = {}
+class TrimmedChatHistory(InMemoryChatMessageHistory):
+    """In-memory chat history that summarizes older turns once it grows too long"""
 
-def get_session_history(session_id: str) -> InMemoryChatMessageHistory:
-    if session_id not in store:
-        store[session_id] = InMemoryChatMessageHistory()
-    return store[session_id]
+    llm: Any = None        # chat model used to write the summary
+    max_chars: int = 4000  # summarize once the history is longer than this
+    keep_last: int = 2     # most recent messages that are always kept as they are
+
+    def add_message(self, message: BaseMessage) -> None:
+        """Add a message and summarize the older part of the history if needed"""
+        self.add_messages([message])
+
+    def add_messages(self, messages) -> None:
+        """Add messages (e.g. a whole exchange), then summarize at most once"""
+        self.messages.extend(messages)
+        # Only the part that can be summarized counts: long recent messages alone
+        # would otherwise trigger a summary call on every message
+        if sum(len(str(m.content)) for m in self.messages[:-self.keep_last]) > self.max_chars:
+            self._summarize()
+
+    def _summarize(self) -> None:
+        """Replace all but the last messages with a single summary message"""
+        older = self.messages[:-self.keep_last]
+        recent = self.messages[-self.keep_last:]
+        # Nothing new to fold in if the older part is just the previous summary
+        if self.llm is None or not older or (len(older) == 1 and isinstance(older[0], SystemMessage)):
+            return
+
+        summary = self.llm.invoke([
+            *older,
+            HumanMessage(content="Summarize the conversation so far in at most 120 tokens.")
+        ]).content
+        self.messages = [SystemMessage(content=f"Summary so far: {summary}"), *recent]
+
+
+# Create the model once and reuse it for every turn
+demo_llm = ChatOllama(model="llama3.2", temperature=0.7, top_p=0.5)
+
+# One history per session, the least recently used sessions are dropped first
+@lru_cache(maxsize=1024)
+def get_session_history(session_id: str) -> TrimmedChatHistory:
+    return TrimmedChatHistory(llm=demo_llm)
+
+# Build the conversation chain once instead of on every turn
+llm_conversation = RunnableWithMessageHistory(demo_llm, get_session_history)
 
 def demo_chatbot():
-    demo_llm = ChatOllama(model="llama3.2", temperature=0.7, top_p=0.5)
     return demo_llm
 
 def demo_conversion(input_text):
-    llm_chain_data = demo_chatbot()
-    llm_conversation = RunnableWithMessageHistory(llm_chain_data, get_session_history)
     chat_reply = llm_conversation.invoke(
         input_text,
         config={"configurable": {"session_id": "default_session"}}
@@ -1,6 +1,62 @@
 # =============== IMPORTING REQUIRED LIBRARIES ===============
 from langchain_ollama import ChatOllama
 from langchain_core.messages import SystemMessage, HumanMessage
+from functools import lru_cache
+import httpx
+import asyncio
+import queue
+import threading
+
+
+# One connection pool shared by all cached models, so requests to the model server
+# reuse kept-alive sockets instead of opening a new connection
+_SHARED_TRANSPORT = httpx.AsyncHTTPTransport(
+    limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60.0)
+)
+
+# One long-lived event loop shared by all Streamlit sessions. Their requests to the
+# model server run on it concurrently, and the pooled connections survive between
+# turns (asyncio.run would close the loop after every call)
+_event_loop = asyncio.new_event_loop()
+threading.Thread(target=_event_loop.run_forever, daemon=True).start()
+
+
+def iterate_async(async_iterator):
+    """Consume an async iterator on the shared background event loop from synchronous code"""
+    items = queue.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for item in async_iterator:
+                items.put((item, None))
+        except Exception as e:
+            items.put((done, e))
+        else:
+            items.put((done, None))
+
+    future = asyncio.run_coroutine_threadsafe(pump(), _event_loop)
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        # Stop the request if the consumer stopped early (e.g. a Streamlit rerun)
+        future.cancel()
+
+
+@lru_cache(maxsize=8)
+def _build_chat_ollama(model_name: str, temperature: float) -> ChatOllama:
+    """Build the AI chat model once per (model, temperature) and reuse it"""
+    return ChatOllama(
+        model=model_name,
+        temperature=temperature,
+        async_client_kwargs={"transport": _SHARED_TRANSPORT}
+    )
 
 
 class AIService:
@@ -9,26 +65,25 @@ class AIService:
     def __init__(self):
         self.model_name = "llama3.2"
     
-    def get_response(self, full_prompt: str, temperature: float):
+    async def astream_response(self, full_prompt: str, temperature: float):
         """
-        Generate AI responses based on user input and settings
+        Generate AI responses as a stream of text chunks, without blocking the event loop
         Parameters:
             full_prompt: The text input from the user + system prompt
             temperature: Controls AI creativity (0.0 = focused, 1.0 = creative)
         """
-        # Return None if no prompt is provided
+        # Nothing to stream if no prompt is provided
         if not full_prompt:
-            return None
-        
-        # Create a new instance of the AI chat model
-        chat_model = ChatOllama(
-            model=self.model_name,
-            temperature=float(temperature)
-        )
-        
-        # Send the messages to the AI and get its response
-        response = chat_model.invoke(input=full_prompt)
-        return response
+            return
+
+        # Reuse the already created model (and its HTTP client) for this temperature
+        chat_model = _build_chat_ollama(self.model_name, round(float(temperature), 3))
+        async for chunk in chat_model.astream(input=full_prompt):
+            yield chunk.content
+
+    def stream_response(self, full_prompt: str, temperature: float):
+        """Synchronous stream for Streamlit; the request itself runs on the shared event loop"""
+        return iterate_async(self.astream_response(full_prompt, temperature))
 
 
 class PromptService:
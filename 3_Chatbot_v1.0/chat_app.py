@@ -1,12 +1,32 @@
+import html
+import markdown
 import streamlit as st
 from ai_service import AIService, PromptService
 
+
+# Styles for the chat history, which is rendered as a single HTML block
+CHAT_HISTORY_CSS = """
+<style>
+    .chat .msg { padding: 0.5rem 1rem; margin-bottom: 0.5rem; border-radius: 0.5rem; }
+    .chat .msg.user { background-color: rgba(128, 128, 128, 0.1); }
+</style>
+"""
+
+
+# The AI service (models, HTTP connections, caches) is created once per server
+# process and shared by all sessions, instead of on every Streamlit rerun
+@st.cache_resource
+def get_ai_service() -> AIService:
+    """Return the shared AIService"""
+    return AIService()
+
+
 class ChatApp:
     """Frontend application for chat interface"""
     
     def __init__(self):
-        self.ai_service = AIService()
-        self.prompt_service = PromptService()
+        self.ai_service = get_ai_service()
+        self.prompt_service = PromptService  # only static methods, no instance needed
         
     def initialize_session_state(self):
         """Initializes required session state variables if they don't exist."""
@@ -15,6 +35,10 @@ class ChatApp:
         if 'messages' not in st.session_state:
             st.session_state.messages = []
         
+        # Chat history already rendered to HTML, one entry per message
+        if 'rendered_html' not in st.session_state:
+            st.session_state.rendered_html = []
+        
         # Initialize temperature change tracker in session state
         if 'temp_changed' not in st.session_state:
             st.session_state.temp_changed = False
@@ -63,42 +87,61 @@ class ChatApp:
         
         return temperature_param, res_type
     
+    def save_message(self, message: dict):
+        """Save a message to chat history and render it to HTML once"""
+        st.session_state.messages.append(message)
+        
+        role = message["role"]
+        label = "You" if role == "user" else "Assistant"
+        st.session_state.rendered_html.append(
+            f'<div class="msg {role}"><b>{html.escape(label)}:</b> {markdown.markdown(message["content"])}</div>'
+        )
+    
     def display_chat_history(self):
-        """Display existing chat messages"""
-        for message in st.session_state.messages:
-            with st.chat_message(message["role"]):
-                st.write(message["content"])
+        """Display existing chat messages with a single HTML render"""
+        if st.session_state.rendered_html:
+            st.html(CHAT_HISTORY_CSS + "<div class='chat'>" + "".join(st.session_state.rendered_html) + "</div>")
+    
+    # @st.fragment reruns only this part of the page when a message is sent,
+    # instead of the whole script (page config, title and controls)
+    @st.fragment
+    def render_chat(self, temperature: float, response_type: str):
+        """Render chat history and handle user input"""
+        
+        # Display existing chat history
+        self.display_chat_history()
+        
+        # Handle user input
+        if user_prompt := st.chat_input("Enter your prompt:"):
+            self.process_user_input(user_prompt, temperature, response_type)
     
     def process_user_input(self, user_prompt: str, temperature: float, response_type: str):
         """Process user input and generate AI response"""
         
         # Save user's message to chat history
-        st.session_state.messages.append({"role": "user", "content": user_prompt})
+        self.save_message({"role": "user", "content": user_prompt})
         
         # Display user message
         with st.chat_message("user"):
             st.write(user_prompt)
         
-        # Show loading spinner while generating response
-        with st.spinner("Generating response..."):
-            # Create prompt
-            full_prompt = self.prompt_service.create_prompt(
-                user_prompt, 
-                response_type
+        # Create prompt
+        full_prompt = self.prompt_service.create_prompt(
+            user_prompt, 
+            response_type
+        )
+        
+        # Display AI response while it is being generated
+        with st.chat_message("assistant"):
+            full_text = st.write_stream(
+                self.ai_service.stream_response(full_prompt, temperature)
             )
-            
-            # Get AI response
-            response = self.ai_service.get_response(full_prompt, temperature)
-            
-            # Save AI's response to chat history
-            st.session_state.messages.append({
-                "role": "assistant", 
-                "content": response.content
-            })
-            
-            # Display AI response
-            with st.chat_message("assistant"):
-                st.write(response.content)
+        
+        # Save AI's response to chat history
+        self.save_message({
+            "role": "assistant", 
+            "content": full_text
+        })
         
         # Add visual separator
         st.divider()
@@ -115,12 +158,8 @@ class ChatApp:
         # Render UI controls
         temperature_param, res_type = self.render_controls()
         
-        # Display existing chat history
-        self.display_chat_history()
-        
-        # Handle user input
-        if user_prompt := st.chat_input("Enter your prompt:"):
-            self.process_user_input(user_prompt, temperature_param, res_type)
+        # Render chat history and input
+        self.render_chat(temperature_param, res_type)
 
 
 # Main entry point
@@ -1,113 +1,460 @@
 # =============== IMPORTING REQUIRED LIBRARIES ===============
-from langchain_ollama import ChatOllama
-from langchain_classic.prompts import (
-    ChatPromptTemplate,
-    SystemMessagePromptTemplate,
-    HumanMessagePromptTemplate,
-    AIMessagePromptTemplate
-)
-from langchain_core.chat_history import InMemoryChatMessageHistory
-from langchain_core.runnables.history import RunnableWithMessageHistory
+from langchain_ollama import ChatOllama, OllamaEmbeddings
+from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableParallel
+from functools import lru_cache
+import httpx
+from typing import TYPE_CHECKING, Any, Optional
+import logging
+import numpy as np
+import os
+import threading
 import streamlit as st
 
+if TYPE_CHECKING:
+    # The other backends are imported where they are built, so only the one in use is needed
+    from langchain_openai import ChatOpenAI
+    from langchain_community.chat_models import ChatLlamaCpp
+
+logger = logging.getLogger(__name__)
+
+
+# One connection pool shared by all cached models, so requests to the model server
+# reuse kept-alive sockets instead of opening a new connection
+_SHARED_TRANSPORT = httpx.HTTPTransport(
+    limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60.0)
+)
+
+
+@lru_cache(maxsize=8)
+def _build_chat_ollama(model_name: str, temperature: float) -> ChatOllama:
+    """Build the AI chat model once per (model, temperature) and reuse it"""
+    return ChatOllama(
+        model=model_name,
+        temperature=temperature,
+        sync_client_kwargs={"transport": _SHARED_TRANSPORT}
+    )
+
+
+# Set USE_VLLM to serve an FP8 model from a local vLLM server (OpenAI-compatible API)
+# instead of Ollama. FP8 halves the weight bytes read per token, and --kv-cache-dtype fp8
+# halves the KV cache (conversation memory) bytes as well:
+#   vllm serve neuralmagic/Llama-3.2-1B-Instruct-FP8 --quantization fp8 --kv-cache-dtype fp8 --enable-prefix-caching
+# Checkpoints with calibrated KV-cache scales (e.g. neuralmagic/Meta-Llama-3-8B-Instruct-FP8-KV)
+# can be used by setting VLLM_MODEL
+USE_VLLM = bool(os.getenv("USE_VLLM"))
+VLLM_BASE_URL = os.getenv("VLLM_BASE_URL", "http://localhost:8000/v1")
+VLLM_MODEL = os.getenv("VLLM_MODEL", "neuralmagic/Llama-3.2-1B-Instruct-FP8")
+
+
+@lru_cache(maxsize=8)
+def _build_vllm_chat_model(model_name: str, temperature: float) -> "ChatOpenAI":
+    """Build the vLLM chat model once per (model, temperature) and reuse it"""
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        base_url=VLLM_BASE_URL,
+        api_key=os.getenv("VLLM_API_KEY", "EMPTY"),
+        model=model_name,
+        temperature=temperature,
+        http_client=httpx.Client(transport=_SHARED_TRANSPORT)
+    )
+
+
+# Set BACKEND=llamacpp and LLAMA_GGUF=<path to a Q4_K_M .gguf file> to run a 4-bit
+# quantized model on the CPU with llama.cpp (needs `pip install llama-cpp-python`)
+BACKEND = os.getenv("BACKEND", "ollama")
+USE_LLAMACPP = BACKEND == "llamacpp"
+
+
+@lru_cache(maxsize=8)
+def _build_llamacpp_chat_model(model_path: str, temperature: float) -> "ChatLlamaCpp":
+    """Load the GGUF model once per (model, temperature) and reuse it"""
+    from langchain_community.chat_models import ChatLlamaCpp
+    return ChatLlamaCpp(
+        model_path=model_path,
+        n_ctx=2048,
+        n_threads=os.cpu_count(),
+        n_gpu_layers=0,
+        temperature=temperature
+    )
+
+
+def _build_chat_model(model_name: str, temperature: float):
+    """Return the (cached) chat model of the configured backend"""
+    if USE_LLAMACPP:
+        return _build_llamacpp_chat_model(model_name, temperature)
+    if USE_VLLM:
+        return _build_vllm_chat_model(model_name, temperature)
+    return _build_chat_ollama(model_name, temperature)
+
+
+class TrimmedChatHistory(InMemoryChatMessageHistory):
+    """In-memory chat history that summarizes older turns once it grows too long"""
+
+    llm: Any = None        # chat model used to write the summary
+    max_chars: int = 4000  # summarize once the history is longer than this
+    keep_last: int = 2     # most recent messages that are always kept as they are
+
+    def add_message(self, message: BaseMessage) -> None:
+        """Add a message and summarize the older part of the history if needed"""
+        self.add_messages([message])
+
+    def add_messages(self, messages) -> None:
+        """Add messages (e.g. a whole exchange), then summarize at most once"""
+        self.messages.extend(messages)
+        # Only the part that can be summarized counts: long recent messages alone
+        # would otherwise trigger a summary call on every message
+        if sum(len(str(m.content)) for m in self.messages[:-self.keep_last]) > self.max_chars:
+            self._summarize()
+
+    def _summarize(self) -> None:
+        """Replace all but the last messages with a single summary message"""
+        older = self.messages[:-self.keep_last]
+        recent = self.messages[-self.keep_last:]
+        # Nothing new to fold in if the older part is just the previous summary
+        if self.llm is None or not older or (len(older) == 1 and isinstance(older[0], SystemMessage)):
+            return
+
+        summary = self.llm.invoke([
+            *older,
+            HumanMessage(content="Summarize the conversation so far in at most 120 tokens.")
+        ]).content
+        self.messages = [SystemMessage(content=f"Summary so far: {summary}"), *recent]
+
+
+class RelevantChatHistory(BaseChatMessageHistory):
+    """
+    Chat history that only returns the past exchanges relevant to the current prompt.
+    Wraps another history; set `query` (and `query_vector`, if the prompt is already
+    embedded) before each call to choose what is relevant. Without embeddings the
+    whole wrapped history is returned.
+    """
+
+    def __init__(self, history: BaseChatMessageHistory, embeddings: Optional[OllamaEmbeddings], k: int = 2, keep_last: int = 1):
+        self.history = history
+        self.embeddings = embeddings
+        self.k = k                  # number of relevant past exchanges to return
+        self.keep_last = keep_last  # most recent exchanges that are always returned
+        self.query = None
+        self.query_vector = None    # normalized embedding of `query`, reused instead of embedding it again
+        self._vectors: dict = {}    # exchange text -> normalized embedding
+
+    @property
+    def messages(self) -> list:
+        """Summary (if any) + top-k relevant past exchanges + the last exchanges"""
+        messages = self.history.messages
+        if self.embeddings is None:
+            return list(messages)
+        head = [m for m in messages[:1] if isinstance(m, SystemMessage)]
+        exchanges = self._exchanges(messages[len(head):])
+        candidates = exchanges[:-self.keep_last]
+        if not self.query or len(candidates) <= self.k:
+            return list(messages)
+
+        texts = ["\n".join(str(m.content) for m in exchange) for exchange in candidates]
+        try:
+            matrix = np.vstack([self._embed(text) for text in texts])
+            query_vector = self.query_vector
+            if query_vector is None:
+                query_vector = self._normalize(self.embeddings.embed_query(self.query))
+        except Exception as e:
+            logger.warning("Embedding failed, sending the whole history: %s", e)
+            return list(messages)
+        # Forget embeddings of exchanges that were summarized away
+        self._vectors = {text: self._vectors[text] for text in texts}
+        scores = matrix @ query_vector
+
+        # argpartition finds the top-k in O(N); keep them in conversation order
+        top = np.sort(np.argpartition(-scores, self.k - 1)[:self.k])
+        selected = [m for i in top for m in candidates[i]]
+        return head + selected + [m for exchange in exchanges[-self.keep_last:] for m in exchange]
+
+    @staticmethod
+    def _exchanges(messages: list) -> list:
+        """Group messages into exchanges, each starting with a user message"""
+        exchanges = []
+        for message in messages:
+            if isinstance(message, HumanMessage) or not exchanges:
+                exchanges.append([message])
+            else:
+                exchanges[-1].append(message)
+        return exchanges
+
+    def add_message(self, message: BaseMessage) -> None:
+        """Add a message to the wrapped history"""
+        self.history.add_message(message)
+
+    def add_messages(self, messages) -> None:
+        """Add messages to the wrapped history in one call, so it summarizes once per exchange"""
+        self.history.add_messages(messages)
+
+    def clear(self) -> None:
+        """Clear the wrapped history and the embeddings"""
+        self.history.clear()
+        self._vectors.clear()
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Return the embedding of an exchange, computed only once per exchange"""
+        if text not in self._vectors:
+            self._vectors[text] = self._normalize(self.embeddings.embed_query(text))
+        return self._vectors[text]
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+
+class SemanticCache:
+    """
+    Response cache that also hits on prompts with a similar meaning
+    ("what's genAI?" vs "explain generative AI"), not only identical ones.
+    Entries are only compared with entries of the same key (model, temperature, style).
+    """
+
+    def __init__(self, embeddings: OllamaEmbeddings, threshold: float = 0.95):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self._matrix = None           # normalized prompt embeddings, one row per entry
+        self._key_ids = None          # key id of each row
+        self._keys: dict = {}         # key -> key id
+        self._responses: list = []
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> np.ndarray:
+        """Return the normalized embedding of a prompt"""
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def lookup(self, vector: np.ndarray, key: tuple):
+        """Return the cached response of the most similar prompt, or None"""
+        size = len(self._responses)
+        if not size or key not in self._keys:
+            return None
+
+        # One matrix-vector product scores all cached prompts at once
+        scores = np.where(self._key_ids[:size] == self._keys[key], self._matrix[:size] @ vector, -1.0)
+        best = int(np.argmax(scores))
+        return self._responses[best] if scores[best] >= self.threshold else None
+
+    def insert(self, vector: np.ndarray, key: tuple, response: str) -> None:
+        """Add a prompt embedding and its response to the cache"""
+        with self._lock:
+            size = len(self._responses)
+            if self._matrix is None:
+                self._matrix = np.empty((16, vector.shape[0]), dtype=np.float32)
+                self._key_ids = np.empty(16, dtype=np.int32)
+            elif size == self._matrix.shape[0]:
+                # Grow by doubling, so inserts stay cheap on average
+                self._matrix = np.concatenate([self._matrix, np.empty_like(self._matrix)])
+                self._key_ids = np.concatenate([self._key_ids, np.empty_like(self._key_ids)])
+
+            self._matrix[size] = vector
+            self._key_ids[size] = self._keys.setdefault(key, len(self._keys))
+            self._responses.append(response)
+
+
+# Shared by all AIService instances (a new one is created on every Streamlit rerun)
+_EMBEDDINGS = OllamaEmbeddings(model="nomic-embed-text")
+_SEMANTIC_CACHE = SemanticCache(_EMBEDDINGS)
+
+# Set SEMANTIC_CACHE=1 to also answer prompts similar to already answered ones.
+# It embeds every new prompt with a local Ollama (`ollama pull nomic-embed-text`),
+# whatever backend generates the answers
+USE_SEMANTIC_CACHE = bool(os.getenv("SEMANTIC_CACHE"))
+
+
+def _embed_prompt(text: str):
+    """Embedding of a prompt for the semantic cache, or None if the embedding model is unavailable"""
+    try:
+        return _SEMANTIC_CACHE.embed(text)
+    except Exception as e:
+        logger.warning("Prompt embedding failed, skipping the semantic cache: %s", e)
+        return None
+
+
+def _invoke(model_name: str, temperature: float, messages: list, history: BaseChatMessageHistory) -> str:
+    """Invoke the AI model with the session history and return the response text"""
+    chat_model = _build_chat_model(model_name, temperature)
+
+    # Static prefix first (reused from the backend's prefix cache), then the
+    # session history, then the per-request part (style note + user message)
+    prefix, tail = messages[:len(_FEW_SHOT)], messages[len(_FEW_SHOT):]
+    return chat_model.invoke([*prefix, *history.messages, *tail]).content
+
+
+# @st.cache_data tells Streamlit to cache this function's output to improve performance
+# Arguments starting with "_" are not hashed, so the cache is keyed only on
+# (model_name, normalized_prompt, temp_bucket). It is only used for the first turn
+# of a session, where no earlier turns can change the answer.
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _cached_invoke(model_name: str, normalized_prompt: str, temp_bucket: float, _messages: list,
+                   _semantic_key: tuple = None) -> str:
+    """
+    Invoke the AI model without chat history and return the response text.
+    Only runs on exact-match misses, so the semantic cache (when a key is
+    given) is consulted, and the prompt embedded, only for new prompts.
+    """
+    query_vector = None
+    if _semantic_key is not None:
+        query_vector = _embed_prompt(_messages[-1].content)
+        if query_vector is not None:
+            cached = _SEMANTIC_CACHE.lookup(query_vector, _semantic_key)
+            if cached is not None:
+                return cached
+
+    content = _build_chat_model(model_name, temp_bucket).invoke(_messages).content
+
+    if query_vector is not None:
+        _SEMANTIC_CACHE.insert(query_vector, _semantic_key, content)
+    return content
+
+
 class AIService:
     """Backend service for handling AI model interactions"""
     
     store = {}
 
     def __init__(self):
-        self.model_name = "llama3.2"
+        # Store the Ollama KV cache in 8 bit instead of FP16: half the memory read per
+        # generated token, with no measurable quality loss. Ollama reads these when the
+        # server starts, so an `ollama serve` started from this process inherits them.
+        os.environ.setdefault("OLLAMA_FLASH_ATTENTION", "1")
+        os.environ.setdefault("OLLAMA_KV_CACHE_TYPE", "q8_0")
+
+        if USE_LLAMACPP:
+            self.model_name = os.environ["LLAMA_GGUF"]
+        elif USE_VLLM:
+            self.model_name = VLLM_MODEL
+        else:
+            self.model_name = "llama3.2"
+        # Past exchanges are ranked with the local Ollama embedding model, so only
+        # when Ollama is the backend (it is then known to be running)
+        self.embeddings = None if USE_LLAMACPP or USE_VLLM else _EMBEDDINGS
+        self.semantic_cache = _SEMANTIC_CACHE if USE_SEMANTIC_CACHE else None
     
     def get_model(self, temperature:float):
         """Return the current AI model with specified temperature setting"""
-        # Create a new instance of the AI chat model
-        model = ChatOllama(
-            model=self.model_name,
-            temperature=float(temperature)
-        )
-        
-        return model
+        # Reuse the already created model (and its HTTP client) for this temperature
+        return _build_chat_model(self.model_name, round(float(temperature), 3))
     
-    def get_session_history(self, session_id: str) -> InMemoryChatMessageHistory:
+    def get_session_history(self, session_id: str) -> RelevantChatHistory:
         if session_id not in self.store:
-            self.store[session_id] = InMemoryChatMessageHistory()
+            # Keep the history short: older turns are replaced by a running summary,
+            # and only the past turns relevant to the current prompt are sent to the model
+            self.store[session_id] = RelevantChatHistory(
+                TrimmedChatHistory(llm=self.get_model(0.0)),
+                self.embeddings
+            )
         return self.store[session_id]
     
-    # @st.cache_data tells Streamlit to cache this function's output to improve performance
-    @st.cache_data
-    def get_response(_self, full_prompt: str, temperature: float):
+    def get_response(self, full_prompt: list, temperature: float):
         """
         Generate AI responses based on user input and settings
         Parameters:
-            full_prompt: The text input from the user + system prompt
+            full_prompt: The messages from PromptService.create_prompt (system prompt + examples + user input)
             temperature: Controls AI creativity (0.0 = focused, 1.0 = creative)
         """
         # Return None if no prompt is provided
         if not full_prompt:
             return None
         
-        # Create a new instance of the AI chat model      
-        chat_model = _self.get_model(temperature)
+        # Let the session history pick the past turns relevant to the user message
+        user_input = full_prompt[-1].content
+        history = self.get_session_history("default_session")
+        history.query = user_input
+        history.query_vector = None
+        temp_bucket = round(float(temperature), 1)
+
+        # Cached answers were produced without earlier turns, so the caches are only
+        # used on the first turn of the session (the wrapped history is still empty)
+        if history.history.messages:
+            content = _invoke(self.model_name, temp_bucket, full_prompt, history)
+        else:
+            # Normalize whitespace (not case, which can change the answer) to raise the hit rate
+            normalized_prompt = " ".join(" ".join(str(m.content) for m in full_prompt).split())
+
+            # On an exact-match miss, answer from the semantic cache if a similar prompt was
+            # already answered with the same model, temperature and style (opt-in)
+            semantic_key = (self.model_name, temp_bucket, full_prompt[-2].content) if self.semantic_cache else None
+
+            content = _cached_invoke(
+                self.model_name,
+                normalized_prompt,
+                temp_bucket,
+                full_prompt,
+                semantic_key
+            )
+
+        # Record the turn on cache hits too, so follow-ups have their context
+        history.add_messages([full_prompt[-1], AIMessage(content=content)])
+
+        # Wrap the text so callers can keep reading response.content
+        return AIMessage(content=content)
+
+    def get_response_variants(self, full_prompt: list, temperatures: list) -> list:
+        """
+        Generate one response per temperature (e.g. to compare or pick a consensus).
+        The requests are sent in parallel, so this takes about as long as a single
+        response if the server runs them concurrently (OLLAMA_NUM_PARALLEL).
+        No chat history is used or updated.
+        """
+        # Return None if no prompt is provided
+        if not full_prompt:
+            return None
+
+        variants = RunnableParallel({
+            str(index): self.get_model(temperature) for index, temperature in enumerate(temperatures)
+        })
+        results = variants.invoke(full_prompt, config={"max_concurrency": len(temperatures)})
+        return [results[str(index)].content for index in range(len(temperatures))]
+
 
-        # Maintain chat history per session
-        chat_with_history = RunnableWithMessageHistory(chat_model, _self.get_session_history)
-        response = chat_with_history.invoke(
-            input=full_prompt,
-            config={"configurable": {"session_id": "default_session"}}
-        )
+# The prompt starts with a static prefix (system prompt + examples) that is the same
+# for every request, so backends with prefix caching (Ollama, vLLM with
+# --enable-prefix-caching) reuse its KV cache. Everything that changes per request
+# (chatbot name, response style, user input) comes after it.
+# The messages are created once at import time and sent as separate chat messages,
+# not as one formatted string, so the message boundaries are kept.
+_FEW_SHOT = [
+    SystemMessage(content="You are a helpful AI assistant."),
 
-        return response
+    # Example 1
+    HumanMessage(content="Can you introduce yourself?"),
+    AIMessage(content="Of course! I'm your friendly AI helper. I’m here to answer your questions and assist you."),
+
+    # Example 2
+    HumanMessage(content="What can you do for me?"),
+    AIMessage(content="I can answer your questions, help you brainstorm ideas, and explain concepts in simple terms."),
+
+    # Example 3
+    HumanMessage(content="Tell me something fun about AI."),
+    AIMessage(content="Sure! Did you know some AIs can generate music or art, almost like human creativity?")
+]
+
+# One line style note per response type
+_STYLE_NOTES = {
+    "standard": "Style: standard.",
+    "creative": "Style: creative. Be imaginative and think outside the box while responding.",
+    "factual": "Style: factual. Stick to verified facts only. If unsure, explicitly state that."
+}
 
 
 class PromptService:
     """Service for handling prompt generation and formatting"""
     
     @staticmethod
-    def create_prompt(user_input: str, response_type: str, chatbot_name: str) -> str:
-        """Creates the prompt for the LLM."""
+    def create_prompt(user_input: str, response_type: str, chatbot_name: str) -> list[BaseMessage]:
+        """Creates the prompt messages for the LLM."""
         
         # Return None if no user input is provided
         if not user_input:
             return None
         
-        # Choose the AI's personality based on response type
-        if response_type == "creative":
-            system_prompt = SystemMessagePromptTemplate.from_template("You are {chatbot_name}, an imaginative AI assistant. Be creative and think outside the box while responding.")
-        elif response_type == "factual":
-            system_prompt = SystemMessagePromptTemplate.from_template("You are {chatbot_name}, a precise AI assistant. Stick to verified facts only. If unsure, explicitly state that.")
-        else:  # standard response type
-            system_prompt = SystemMessagePromptTemplate.from_template("You are {chatbot_name}, a helpful AI assistant.")
-        
-        # Example 1
-        example_human1 = HumanMessagePromptTemplate.from_template("Can you introduce yourself?")
-        example_ai1 = AIMessagePromptTemplate.from_template(
-            "Of course! I'm {chatbot_name}, your friendly AI helper. I’m here to answer your questions and assist you."
-        )
-
-        # Example 2
-        example_human2 = HumanMessagePromptTemplate.from_template("What can you do for me?")
-        example_ai2 = AIMessagePromptTemplate.from_template(
-            "I can answer your questions, help you brainstorm ideas, and explain concepts in simple terms."
-        )
-
-        # Example 3
-        example_human3 = HumanMessagePromptTemplate.from_template("Tell me something fun about AI.")
-        example_ai3 = AIMessagePromptTemplate.from_template(
-            "Sure! Did you know some AIs can generate music or art, almost like human creativity?"
-        )
-
-        # Placeholder for real user input
-        human_message = HumanMessagePromptTemplate.from_template("{user_input}")
-
-        # Build prompt
-        prompt_template = ChatPromptTemplate.from_messages([
-            system_prompt,
-            example_human1, example_ai1,
-            example_human2, example_ai2,
-            example_human3, example_ai3,
-            human_message
-        ])
-
-        prompt = prompt_template.format(chatbot_name=chatbot_name, user_input=user_input)
-        return prompt
-
+        # Dynamic part: name and response style, then the real user input
+        style_note = _STYLE_NOTES.get(response_type, _STYLE_NOTES["standard"])
+        return _FEW_SHOT + [
+            SystemMessage(content=f"Your name is {chatbot_name}. {style_note}"),
+            HumanMessage(content=user_input)
+        ]
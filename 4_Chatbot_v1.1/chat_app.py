@@ -1,12 +1,39 @@
+from collections import namedtuple
+import html
+import markdown
 import streamlit as st
 from ai_service import AIService, PromptService
 
+
+# Styles for the chat history, which is rendered as a single HTML block
+CHAT_HISTORY_CSS = """
+<style>
+    .chat .msg { padding: 0.5rem 1rem; margin-bottom: 0.5rem; border-radius: 0.5rem; }
+    .chat .msg.user { background-color: rgba(128, 128, 128, 0.1); }
+</style>
+"""
+
+# Response types offered in the selector
+RESPONSE_TYPES = ("standard", "creative", "factual")
+
+# Single chat message, smaller and faster to create than a dict
+ChatMsg = namedtuple("ChatMsg", "role name content")
+
+
+# The AI service (models, HTTP connections, caches) is created once per server
+# process and shared by all sessions, instead of on every Streamlit rerun
+@st.cache_resource
+def get_ai_service() -> AIService:
+    """Return the shared AIService"""
+    return AIService()
+
+
 class ChatApp:
     """Frontend application for chat interface"""
     
     def __init__(self):
-        self.ai_service = AIService()
-        self.prompt_service = PromptService()
+        self.ai_service = get_ai_service()
+        self.prompt_service = PromptService  # only static methods, no instance needed
         self.chatbot_name = "ChatBotX"
         
     def initialize_session_state(self):
@@ -16,6 +43,10 @@ class ChatApp:
         if 'messages' not in st.session_state:
             st.session_state.messages = []
         
+        # Chat history already rendered to HTML, one entry per message
+        if 'rendered_html' not in st.session_state:
+            st.session_state.rendered_html = []
+        
         # Initialize temperature change tracker in session state
         if 'temp_changed' not in st.session_state:
             st.session_state.temp_changed = False
@@ -50,24 +81,45 @@ class ChatApp:
         # Response type selector
         res_type = st.selectbox(
             "Select response type:",
-            ("standard", "creative", "factual"),
+            RESPONSE_TYPES,
             index=0,
             help="Choose the type of response you want from the AI"
         )
         
         return temperature_param, res_type
     
+    def save_message(self, message: ChatMsg):
+        """Save a message to chat history and render it to HTML once"""
+        ss = st.session_state
+        ss.messages.append(message)
+        ss.rendered_html.append(
+            f'<div class="msg {message.role}"><b>{html.escape(message.name)}:</b> {markdown.markdown(message.content)}</div>'
+        )
+    
     def display_chat_history(self):
-        """Display existing chat messages"""
-        for message in st.session_state.messages:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
+        """Display existing chat messages with a single HTML render"""
+        rendered_html = st.session_state.rendered_html
+        if rendered_html:
+            st.html(CHAT_HISTORY_CSS + "<div class='chat'>" + "".join(rendered_html) + "</div>")
+    
+    # @st.fragment reruns only this part of the page when a message is sent,
+    # instead of the whole script (page config, title and controls)
+    @st.fragment
+    def render_chat(self, temperature: float, response_type: str):
+        """Render chat history and handle user input"""
+        
+        # Display existing chat history
+        self.display_chat_history()
+        
+        # Handle user input
+        if user_prompt := st.chat_input("Enter your prompt:"):
+            self.process_user_input(user_prompt, temperature, response_type)
     
     def process_user_input(self, user_prompt: str, temperature: float, response_type: str):
         """Process user input and generate AI response"""
         
         # Save user's message to chat history
-        st.session_state.messages.append({"role": "user", "content": user_prompt})
+        self.save_message(ChatMsg("user", "You", user_prompt))
         
         # Display user message
         with st.chat_message("user"):
@@ -87,11 +139,7 @@ class ChatApp:
             ai_message = response.content
             
             # Save AI's response to chat history
-            st.session_state.messages.append({
-                "role": "assistant", 
-                "name": self.chatbot_name,
-                "content": ai_message
-            })
+            self.save_message(ChatMsg("assistant", self.chatbot_name, ai_message))
             
             # Display AI response
             with st.chat_message("assistant"):
@@ -112,12 +160,8 @@ class ChatApp:
         # Render UI controls
         temperature_param, res_type = self.render_controls()
         
-        # Display existing chat history
-        self.display_chat_history()
-        
-        # Handle user input
-        if user_prompt := st.chat_input("Enter your prompt:"):
-            self.process_user_input(user_prompt, temperature_param, res_type)
+        # Render chat history and input
+        self.render_chat(temperature_param, res_type)
 
 
 # Main entry point
@@ -2,12 +2,16 @@
 Main Streamlit application entry point.
 Orchestrates UI components and AI services with dependency injection.
 """
+import logging
+import uuid
 import streamlit as st
 import yaml
 from pathlib import Path
 from src import ChatbotService, ConversationManager
 from ui import PageConfigComponent, SidebarComponent, ChatInterface
 
+logger = logging.getLogger(__name__)
+
 def validate_config_structure(config: dict) -> None:
     """Validate that configuration contains all required keys"""
     required_keys = {
@@ -47,11 +51,24 @@ def load_config() -> dict:
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML in configuration file: {e}")
 
+@st.cache_resource(show_spinner=False)
+def get_chatbot_service(config: dict) -> ChatbotService:
+    """
+    Create the chatbot service once per server process instead of on every rerun,
+    so its model, chain and response caches and the session histories are kept
+    """
+    return ChatbotService(config)
+
+
 def initialize_services(config: dict) -> tuple:
     """Initialize all services with dependency injection"""
-    chatbot_service = ChatbotService(config)
-    conversation_manager = ConversationManager()
-    return chatbot_service, conversation_manager
+    chatbot_service = get_chatbot_service(config)
+
+    # The conversation is the single copy of the transcript, so it must survive reruns.
+    # The service is shared by all browser sessions, so each session gets its own history key
+    if 'conversation_manager' not in st.session_state:
+        st.session_state.conversation_manager = ConversationManager(session_id=uuid.uuid4().hex)
+    return chatbot_service, st.session_state.conversation_manager
 
 
 def main():
@@ -68,11 +85,11 @@ def main():
     
     # Create UI components
     chat_interface = ChatInterface(config, chatbot_service, conversation_manager)
-    sidebar = SidebarComponent(config, conversation_manager)
+    sidebar = SidebarComponent(config, conversation_manager, chatbot_service)
     
     # Render sidebar and get settings
     res_type = sidebar.render()
-    print(f"Selected response type: {res_type}")
+    logger.debug("Selected response type: %s", res_type)
 
     # Render main chat interface
     chat_interface.render(res_type)
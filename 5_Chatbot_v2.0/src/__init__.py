@@ -3,8 +3,10 @@ Core source code package for the chatbot application.
 
 This package contains the main business logic and AI service components.
 """
-from .chatbot import ChatbotService, ChatRequest, ChatResponse, PromptService
+from .chatbot import ChatbotService, ChatRequest, ChatResponse, PromptService, run_async
 from .conversation_manager import ConversationManager, ConversationMessage
+from .semantic_cache import SemanticCache
+from .batched_inferencer import BatchedInferencer
 #from .nlp_utils import TextProcessor, IntentClassifier, EntityExtractor
 #from .api_utils import APIClient, ModelAPIAdapter, ExternalServiceIntegration
 
@@ -16,11 +18,18 @@ __all__ = [
     'ChatRequest', 
     'ChatResponse',
     'PromptService',
+    'run_async',
     
     # Conversation management
     'ConversationManager',
     'ConversationMessage',
     
+    # Response caching
+    'SemanticCache',
+
+    # Request batching
+    'BatchedInferencer',
+    
     # NLP utilities
     'TextProcessor',
     'IntentClassifier', 
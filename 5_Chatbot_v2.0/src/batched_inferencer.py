@@ -0,0 +1,77 @@
+"""
+Request batching independent of UI framework.
+Coalesces concurrent non-streaming LLM calls into micro-batches so a
+backend with server-side batching serves many sessions per round-trip.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+from langchain_core.runnables import Runnable
+
+
+class BatchedInferencer:
+    """Micro-batching queue in front of Runnable.abatch"""
+
+    def __init__(self, max_batch_size: int = 16, max_wait: float = 0.02, max_concurrency: int = 16):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait              # seconds to wait for more requests after the first
+        self.max_concurrency = max_concurrency
+        self._queue: Optional[asyncio.Queue] = None   # created on the loop of the first submit
+        self._worker: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()      # in-flight batches, referenced until done
+
+    async def submit(self, runnable: Runnable, input: Any, config: Dict[str, Any]) -> Any:
+        """Queue one call and wait for its result from the next batch"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._drain())
+
+        future = loop.create_future()
+        await self._queue.put((runnable, input, config, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Runnable, Any, Dict[str, Any], asyncio.Future]]:
+        """Wait for one request, then gather more until the batch is full or max_wait passes"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run_group(self, items: List[Tuple[Runnable, Any, Dict[str, Any], asyncio.Future]]) -> None:
+        """Send the calls for one runnable as a single batch and resolve their futures"""
+        runnable = items[0][0]
+        configs = [{**config, "max_concurrency": self.max_concurrency} for _, _, config, _ in items]
+        try:
+            results = await runnable.abatch([input for _, input, _, _ in items], config=configs, return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(items)
+
+        for (_, _, _, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _drain(self) -> None:
+        """Background task: batch queued calls, grouped by runnable (one per model and temperature)"""
+        while True:
+            batch = await self._collect()
+            groups: Dict[int, list] = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+            # Batches run in the background so the next one is collected while they generate
+            for items in groups.values():
+                task = asyncio.create_task(self._run_group(items))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
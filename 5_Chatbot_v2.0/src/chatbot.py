@@ -2,85 +2,336 @@
 Pure AI service layer with no Streamlit dependencies.
 Handles all AI model interactions and business logic.
 """
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
-from langchain_ollama import ChatOllama
-from langchain_classic.prompts import (
-    ChatPromptTemplate,
-    SystemMessagePromptTemplate,
-    HumanMessagePromptTemplate,
-    AIMessagePromptTemplate
-)
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from operator import attrgetter
+import httpx
+import numpy as np
+from typing import TYPE_CHECKING, Optional, Dict, Any, Iterable, Iterator, List, Sequence, Tuple
+from langchain_classic.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.globals import set_llm_cache
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from functools import lru_cache
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+from .semantic_cache import SemanticCache
+from .batched_inferencer import BatchedInferencer
+
+if TYPE_CHECKING:
+    # The backends are imported where they are built, so only the one in use is loaded
+    from langchain_ollama import ChatOllama
+    from langchain_huggingface import ChatHuggingFace
+
+logger = logging.getLogger(__name__)
+
+# Only answers generated at or below this temperature are cached (exact and semantic):
+# higher temperatures are meant to give a different answer every time
+SEMANTIC_CACHE_MAX_TEMPERATURE = 0.3
+
+# Streamed tokens are joined and handed to the UI at most this often (seconds),
+# since every yield re-renders the markdown of the whole answer
+STREAM_FLUSH_INTERVAL = 0.02
+
+# Longest user input sent to the model, in tokens; longer input is truncated
+MAX_USER_TOKENS = 4096
+
+# One long-lived event loop for async calls from Streamlit's synchronous script,
+# so pooled connections survive between turns (asyncio.run closes its loop each time)
+_event_loop = asyncio.new_event_loop()
+threading.Thread(target=_event_loop.run_forever, daemon=True).start()
+
+
+def run_async(coroutine):
+    """Run a coroutine on the shared background event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coroutine, _event_loop).result()
+
+
+# Connection pools shared by all Ollama clients, so requests reuse kept-alive sockets
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60.0)
+_SHARED_TRANSPORT = httpx.HTTPTransport(limits=_POOL_LIMITS)
+_SHARED_ASYNC_TRANSPORT = httpx.AsyncHTTPTransport(limits=_POOL_LIMITS)
+
+def _chunk_texts(stream: Iterable[Any]) -> Iterator[str]:
+    """Text of each streamed chunk; how to get it is decided once, from the first chunk"""
+    stream = iter(stream)
+    first = next(stream, None)
+    if first is None:
+        return
+    to_text = attrgetter('content') if hasattr(first, 'content') else str
+    yield to_text(first)
+    yield from map(to_text, stream)
+
+
+def _coalesce(texts: Iterable[str], interval: float = STREAM_FLUSH_INTERVAL) -> Iterator[str]:
+    """Join streamed texts and yield them at most every `interval` seconds (the first one right away)"""
+    buffer: List[str] = []
+    deadline = 0.0
+    for text in texts:
+        buffer.append(text)
+        now = time.monotonic()
+        if now >= deadline:
+            yield "".join(buffer)
+            buffer.clear()
+            deadline = now + interval
+    if buffer:
+        yield "".join(buffer)
+
+
+def configure_llm_cache(cache_config: Dict[str, Any]) -> None:
+    """
+    Share LLM responses through Redis when `cache.redis_url` is configured, so
+    cached answers survive Streamlit reruns and are shared between processes.
+    Requires the optional `redis` package.
+    """
+    redis_url = cache_config.get('redis_url')
+    if not (cache_config.get('enabled') and redis_url):
+        return
+
+    import redis
+    from langchain_community.cache import RedisCache
+    set_llm_cache(RedisCache(redis.Redis.from_url(redis_url), ttl=cache_config.get('ttl')))
+
 
-@dataclass
+# Prompt text, formatted with the chatbot name once per name
+_SYSTEM_TEMPLATE = "You are {chatbot_name}, a helpful AI assistant."
+
+# Example conversations for context
+_EXAMPLES: Tuple[Tuple[str, str], ...] = (
+    (
+        "Can you introduce yourself?",
+        "Of course! I'm {chatbot_name}, your friendly AI helper. I'm here to answer your questions and assist you."
+    ),
+    (
+        "What can you do for me?",
+        "I can answer your questions, help you brainstorm ideas, and explain concepts in simple terms."
+    ),
+    (
+        "Tell me something fun about AI.",
+        "Sure! Did you know some AIs can generate music or art, almost like human creativity?"
+    )
+)
+
+# Personality notes go after the shared prefix so the prefix is the same for every response type
+_STYLE_PROMPTS = {
+    "creative": "Be imaginative. Think outside the box while responding.",
+    "factual": "Be precise. Stick to verified facts only. If unsure, explicitly state that."
+}
+
+# Shared prompt prefix first, then the session history, then the new user turn,
+# so the start of every request is identical and only the new turn is stored
+HISTORY_PROMPT = ChatPromptTemplate.from_messages([
+    MessagesPlaceholder("prefix"),
+    MessagesPlaceholder("history"),
+    MessagesPlaceholder("question")
+])
+
+@dataclass(frozen=True, slots=True)
 class ChatResponse:
-    """Structured response from AI service"""
+    """Structured response from AI service (immutable)"""
     message: str
     confidence: float = 1.0
     response_type: str = "standard"
     metadata: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChatRequest:
-    """Structured request to AI service"""
+    """Structured request to AI service (immutable and hashable, usable as a cache key)"""
     user_input: str
     temperature: float = 0.7
     response_type: str = "standard"
     session_id: str = "default_session"
 
 
+class WindowedHistory(InMemoryChatMessageHistory):
+    """Chat history that keeps only the last `max_turns` exchanges sent to the LLM"""
+    max_turns: int = 10
+
+    def add_message(self, message: BaseMessage) -> None:
+        """Add a message, dropping the oldest beyond the window"""
+        self.add_messages([message])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Add messages, dropping the oldest beyond the window"""
+        self.messages.extend(messages)
+        # Slice by count to keep: [:-0] would drop nothing when max_turns is 0
+        keep = max(2 * self.max_turns, 0)
+        del self.messages[:len(self.messages) - keep]
+
+
 class ChatbotService:
     """Backend service for handling AI model interactions"""
+
+    # Least recently used session histories are dropped beyond this many sessions
+    MAX_SESSIONS = 256
+    # Exact-match responses kept in the in-process LRU
+    RESPONSE_CACHE_SIZE = 256
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], async_transport: Optional[httpx.AsyncHTTPTransport] = None):
         self.model_name = config['ai_model']['name']
         self.chatbot_name = config['chatbot']['name']
         self.repo= config['llm']['repo']
         self.api_token= config['llm']['api_token']
         self.api_endpoint= config['llm']['api_endpoint']
-        self.store: Dict[str, InMemoryChatMessageHistory] = {}
+        # Mark the prompt prefix as a provider-side cache block (providers that support cache_control)
+        self.cache_control = config['llm'].get('cache_control', False)
+        self.history_turns = config['chatbot'].get('history_turns', 10)
+        self.store: "OrderedDict[str, WindowedHistory]" = OrderedDict()
+        cache_config = config.get('cache', {})
+        # Opt-in: the semantic cache loads a sentence-transformers model
+        self.semantic_cache = SemanticCache() if cache_config.get('enabled') and cache_config.get('semantic') else None
+        self._resp_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self.inferencer = BatchedInferencer()
+        self._tokenizer: Any = None   # loaded on first long input, False if unavailable
+        self.async_transport = async_transport or _SHARED_ASYNC_TRANSPORT
+        configure_llm_cache(cache_config)
+        # Models and history-wrapped chains are built once per (rounded) temperature
+        self._models: Dict[float, "ChatOllama"] = {}
+        self._hf_models: Dict[float, "ChatHuggingFace"] = {}
+        self._chains: Dict[Tuple[str, float], RunnableWithMessageHistory] = {}
         
-    def get_model(self, temperature: float) -> ChatOllama:
+    def get_model(self, temperature: float) -> "ChatOllama":
         """Return the current AI model with specified temperature setting"""
-        return ChatOllama(
-            model=self.model_name,
-            temperature=float(temperature)
-        )
+        temperature = round(float(temperature), 2)
+        model = self._models.get(temperature)
+        if model is None:
+            from langchain_ollama import ChatOllama
+            model = self._models[temperature] = ChatOllama(
+                model=self.model_name,
+                temperature=temperature,
+                sync_client_kwargs={"transport": _SHARED_TRANSPORT},
+                async_client_kwargs={"transport": self.async_transport}
+            )
+        return model
 
-    def get_huggingface_model(self, temperature: float) -> ChatHuggingFace:
+    def get_huggingface_model(self, temperature: float) -> "ChatHuggingFace":
         """
         Return the Hugging Face LLM wrapper compatible with LangChain.
         """
-        llm = HuggingFaceEndpoint(
-            repo_id=self.repo, # Model name
-            huggingfacehub_api_token=self.api_token,
-            temperature=temperature,
-            streaming=True,
-            do_sample=True
-        )
+        temperature = round(float(temperature), 2)
+        model = self._hf_models.get(temperature)
+        if model is None:
+            from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+            llm = HuggingFaceEndpoint(
+                repo_id=self.repo, # Model name
+                huggingfacehub_api_token=self.api_token,
+                temperature=temperature,
+                streaming=True,
+                do_sample=True
+            )
+            model = self._hf_models[temperature] = ChatHuggingFace(llm=llm)
+        return model
 
-        return ChatHuggingFace(llm=llm)
+    def clear_session(self, session_id: str) -> None:
+        """Forget the model-side history of a session"""
+        self.store.pop(session_id, None)
 
-    def get_session_history(self, session_id: str) -> InMemoryChatMessageHistory:
+    def get_session_history(self, session_id: str) -> WindowedHistory:
         """Get or create session history for conversation management"""
-        if session_id not in self.store:
-            self.store[session_id] = InMemoryChatMessageHistory()
-        return self.store[session_id]
+        history = self.store.get(session_id)
+        if history is None:
+            history = self.store[session_id] = WindowedHistory(max_turns=self.history_turns)
+            if len(self.store) > self.MAX_SESSIONS:
+                self.store.popitem(last=False)
+        else:
+            self.store.move_to_end(session_id)
+        return history
+
+    def _with_history(self, chat_model) -> RunnableWithMessageHistory:
+        """Wrap a chat model so session history is inserted between the prompt prefix and the user turn"""
+        return RunnableWithMessageHistory(
+            HISTORY_PROMPT | chat_model,
+            self.get_session_history,
+            input_messages_key="question",
+            history_messages_key="history"
+        )
+
+    def _get_chain(self, backend: str, temperature: float) -> RunnableWithMessageHistory:
+        """Return the cached history-wrapped chain for a backend ("ollama" or "huggingface") and temperature"""
+        key = (backend, round(float(temperature), 2))
+        chain = self._chains.get(key)
+        if chain is None:
+            chat_model = self.get_huggingface_model(temperature) if backend == "huggingface" else self.get_model(temperature)
+            chain = self._chains[key] = self._with_history(chat_model)
+        return chain
+
+    @staticmethod
+    def _history_input(full_prompt: List[BaseMessage]) -> Dict[str, List[BaseMessage]]:
+        """Split a prompt from PromptService into the cacheable prefix and the new user turn"""
+        return {"prefix": full_prompt[:-1], "question": full_prompt[-1:]}
     
-    @lru_cache(maxsize=100)
-    def _cached_response(self, full_prompt: str, temperature: float, session_id: str) -> str:
-        """Internal cached response method"""
-        chat_model = self.get_model(temperature)
-        chat_with_history = RunnableWithMessageHistory(chat_model, self.get_session_history)
+    def _get_tokenizer(self) -> Any:
+        """Load the tokenizer of the endpoint model, or return False if it cannot be loaded"""
+        if self._tokenizer is None:
+            try:
+                from transformers import AutoTokenizer
+                self._tokenizer = AutoTokenizer.from_pretrained(self.repo, token=self.api_token)
+            except Exception:
+                self._tokenizer = False
+        return self._tokenizer
+
+    def _apply_token_budget(self, request: ChatRequest) -> Tuple[ChatRequest, bool]:
+        """Truncate the user input to MAX_USER_TOKENS tokens; returns the request and whether it was truncated"""
+        encoded = request.user_input.encode()
+        # No token is shorter than one byte, so short input needs no tokenizing
+        if len(encoded) <= MAX_USER_TOKENS:
+            return request, False
+
+        tokenizer = self._get_tokenizer()
+        if tokenizer:
+            tokens = tokenizer.encode(request.user_input, add_special_tokens=False)
+            if len(tokens) <= MAX_USER_TOKENS:
+                return request, False
+            user_input = tokenizer.decode(tokens[:MAX_USER_TOKENS])
+        else:
+            # Without a tokenizer, assume about 4 bytes per token
+            limit = MAX_USER_TOKENS * 4
+            if len(encoded) <= limit:
+                return request, False
+            user_input = encoded[:limit].decode(errors="ignore")
+        return replace(request, user_input=user_input), True
+
+    def _embed_query(self, text: str) -> Optional[np.ndarray]:
+        """Embedding of a question for the semantic cache, or None if the encoder is unavailable"""
+        try:
+            return self.semantic_cache.embed(text)
+        except Exception as e:
+            logger.warning("Question embedding failed, skipping the semantic cache: %s", e)
+            return None
+
+    @staticmethod
+    def _response_key(full_prompt: List[BaseMessage], temperature: float) -> bytes:
+        """Short fixed-size cache key for a prompt at a temperature"""
+        text = "\x1e".join(message.content for message in full_prompt)
+        return hashlib.blake2b(text.encode(), digest_size=16, key=str(temperature).encode()).digest()
+
+    def _get_cached_response(self, key: bytes) -> Optional[str]:
+        """Return the exact-match cached response, marking it as recently used"""
+        content = self._resp_cache.get(key)
+        if content is not None:
+            self._resp_cache.move_to_end(key)
+        return content
+
+    def _cache_response(self, key: bytes, content: str) -> None:
+        """Store a response, evicting the least recently used beyond RESPONSE_CACHE_SIZE"""
+        self._resp_cache[key] = content
+        self._resp_cache.move_to_end(key)
+        if len(self._resp_cache) > self.RESPONSE_CACHE_SIZE:
+            self._resp_cache.popitem(last=False)
+
+    async def _invoke_response(self, full_prompt: List[BaseMessage], temperature: float, session_id: str) -> str:
+        """Internal (non-streaming) response method, batched with concurrent requests"""
+        chat_with_history = self._get_chain("ollama", temperature)
         
-        response = chat_with_history.invoke(
-            input=full_prompt,
-            config={"configurable": {"session_id": session_id}}
+        response = await self.inferencer.submit(
+            chat_with_history,
+            self._history_input(full_prompt),
+            {"configurable": {"session_id": session_id}}
         )
 
         return response.content if hasattr(response, 'content') else str(response)
@@ -89,29 +340,69 @@ class ChatbotService:
         """
         Generate AI responses based on user input and settings
         Returns structured ChatResponse object
+        From synchronous code (e.g. Streamlit) call it as run_async(service.get_response(request))
         """
-        if not request.user_input:
+        if not request.user_input or not request.user_input.strip():
             return ChatResponse(
                 message="Please provide input for the chatbot.",
                 confidence=0.0,
                 response_type=request.response_type
             )
+
+        request, truncated = self._apply_token_budget(request)
         
         try:
             # Create full prompt using prompt service
             full_prompt = PromptService.create_prompt(
                 request.user_input, 
                 request.response_type, 
-                self.chatbot_name
+                self.chatbot_name,
+                self.cache_control
             )
             
-            # Get response using cached method
-            response_content = self._cached_response(
+            # Cached answers were produced without earlier turns, so they are only used
+            # (and stored) for the first turn of a session, where no history can change the answer,
+            # and only at temperatures whose answers are cached at all
+            history = self.get_session_history(request.session_id)
+            use_cache = not history.messages and request.temperature <= SEMANTIC_CACHE_MAX_TEMPERATURE
+
+            # Answer from the exact-match cache first (no embedding needed), then from
+            # the semantic cache if a similar question was already answered with the same response type
+            cached_content = query_vector = None
+            if use_cache:
+                response_key = self._response_key(full_prompt, request.temperature)
+                cached_content = self._get_cached_response(response_key)
+                if cached_content is None and self.semantic_cache is not None:
+                    query_vector = await asyncio.to_thread(self._embed_query, request.user_input)
+                    if query_vector is not None:
+                        cached_content = self.semantic_cache.lookup(query_vector, request.response_type)
+            if cached_content is not None:
+                # Record the turn as if the model had answered, so follow-ups have their context
+                history.add_messages([full_prompt[-1], AIMessage(content=cached_content)])
+                return ChatResponse(
+                    message=cached_content,
+                    confidence=1.0,
+                    response_type=request.response_type,
+                    metadata={
+                        "temperature": request.temperature,
+                        "session_id": request.session_id,
+                        "model": self.model_name,
+                        "cached": True,
+                        "truncated": truncated
+                    }
+                )
+            
+            response_content = await self._invoke_response(
                 full_prompt, 
                 request.temperature, 
                 request.session_id
             )
             
+            if use_cache:
+                self._cache_response(response_key, response_content)
+                if query_vector is not None:
+                    self.semantic_cache.insert(query_vector, response_content, request.response_type)
+            
             return ChatResponse(
                 message=response_content,
                 confidence=1.0,
@@ -119,7 +410,8 @@ class ChatbotService:
                 metadata={
                     "temperature": request.temperature,
                     "session_id": request.session_id,
-                    "model": self.model_name
+                    "model": self.model_name,
+                    "truncated": truncated
                 }
             )
             
@@ -131,26 +423,24 @@ class ChatbotService:
                 metadata={"error": str(e)}
             )
     
-    def _get_streaming_response(self, full_prompt: str, temperature: float, session_id: str):
+    def _get_streaming_response(self, full_prompt: List[BaseMessage], temperature: float, session_id: str):
         """Internal streaming response method (not cached)"""
-        chat_model = self.get_model(temperature)
-        chat_with_history = RunnableWithMessageHistory(chat_model, self.get_session_history)
+        chat_with_history = self._get_chain("ollama", temperature)
         
         # Use stream for streaming responses
         return chat_with_history.stream(
-            input=full_prompt,
-            config={"configurable": {"session_id": "session_id"}}
+            input=self._history_input(full_prompt),
+            config={"configurable": {"session_id": session_id}}
         )
 
-    def _get_huggingface_streaming_response(self, full_prompt: str, temperature: float):
+    def _get_huggingface_streaming_response(self, full_prompt: List[BaseMessage], temperature: float, session_id: str):
         """Internal streaming response method (not cached)"""
-        chat_model = self.get_huggingface_model(temperature)
-        chat_with_history = RunnableWithMessageHistory(chat_model, self.get_session_history)
+        chat_with_history = self._get_chain("huggingface", temperature)
         
         # Use stream for streaming responses
         return chat_with_history.stream(
-            input=full_prompt,
-            config={"configurable": {"session_id": "session_id"}}
+            input=self._history_input(full_prompt),
+            config={"configurable": {"session_id": session_id}}
         )
     
     def get_response_stream(self, request: ChatRequest):
@@ -158,16 +448,19 @@ class ChatbotService:
         Generate streaming AI responses based on user input and settings
         Returns generator that yields response chunks
         """
-        if not request.user_input:
+        if not request.user_input or not request.user_input.strip():
             yield "Please provide input for the chatbot."
             return
+
+        request, _ = self._apply_token_budget(request)
         
         try:
             # Create full prompt using prompt service
             full_prompt = PromptService.create_prompt(
                 request.user_input, 
                 request.response_type, 
-                self.chatbot_name
+                self.chatbot_name,
+                self.cache_control
             )
 
             #####    code to use local model for streaming  #####
@@ -182,66 +475,51 @@ class ChatbotService:
             # Get streaming response (no caching for streams)
             stream = self._get_huggingface_streaming_response(
                 full_prompt, 
-                request.temperature
+                request.temperature,
+                request.session_id
             )
 
-            # Yield each chunk from the stream
-            for chunk in stream:
-                if hasattr(chunk, 'content'):
-                    yield chunk.content
-                else:
-                    yield str(chunk)
+            # Yield the streamed text in batches of up to STREAM_FLUSH_INTERVAL
+            yield from _coalesce(_chunk_texts(stream))
                     
         except Exception as e:
             yield f"Error generating response: {str(e)}"
 
 class PromptService:
     """Service for handling prompt generation and formatting"""
-    
-    @staticmethod
-    def create_prompt(user_input: str, response_type: str, chatbot_name: str) -> str:
-        """Creates the formatted prompt for the LLM"""
+
+    @classmethod
+    def create_prompt(cls, user_input: str, response_type: str, chatbot_name: str,
+                      cache_control: bool = False) -> Optional[List[BaseMessage]]:
+        """
+        Creates the message list for the LLM.
+        The system prompt and examples come first and are byte-identical on every
+        request, so the backend can reuse its prefix cache; only the tail varies.
+        With cache_control the end of that prefix is marked as an explicit cache block.
+        """
         if not user_input:
             return None
-            
-        # Choose the AI's personality based on response type
-        system_prompts = {
-            "creative": f"You are {chatbot_name}, an imaginative AI assistant. Be creative and think outside the box while responding.",
-            "factual": f"You are {chatbot_name}, a precise AI assistant. Stick to verified facts only. If unsure, explicitly state that.",
-            "standard": f"You are {chatbot_name}, a helpful AI assistant."
-        }
-        
-        system_prompt = SystemMessagePromptTemplate.from_template(
-            system_prompts.get(response_type, system_prompts["standard"])
-        )
-        
-        # Example conversations for context
-        examples = [
-            (
-                "Can you introduce yourself?",
-                f"Of course! I'm {chatbot_name}, your friendly AI helper. I'm here to answer your questions and assist you."
-            ),
-            (
-                "What can you do for me?", 
-                "I can answer your questions, help you brainstorm ideas, and explain concepts in simple terms."
-            ),
-            (
-                "Tell me something fun about AI.",
-                "Sure! Did you know some AIs can generate music or art, almost like human creativity?"
+
+        prompt = list(cls._build_prefix(chatbot_name, cache_control))
+        style = _STYLE_PROMPTS.get(response_type)
+        if style:
+            prompt.append(SystemMessage(content=style))
+        prompt.append(HumanMessage(content=user_input))
+        return prompt
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _build_prefix(chatbot_name: str, cache_control: bool = False) -> Tuple[BaseMessage, ...]:
+        """Builds the system prompt and example conversations once per chatbot name"""
+        prefix = [SystemMessage(content=_SYSTEM_TEMPLATE.format(chatbot_name=chatbot_name))]
+        for human_msg, ai_msg in _EXAMPLES:
+            prefix.extend([HumanMessage(content=human_msg), AIMessage(content=ai_msg.format(chatbot_name=chatbot_name))])
+
+        if cache_control:
+            # Everything up to and including the last example is cached by the provider
+            prefix[-1] = AIMessage(
+                content=prefix[-1].content,
+                additional_kwargs={"cache_control": {"type": "ephemeral"}}
             )
-        ]
-        
-        # Build message list
-        messages = [system_prompt]
-        
-        for human_msg, ai_msg in examples:
-            messages.extend([
-                HumanMessagePromptTemplate.from_template(human_msg),
-                AIMessagePromptTemplate.from_template(ai_msg)
-            ])
-        
-        messages.append(HumanMessagePromptTemplate.from_template("{user_input}"))
-        
-        # Create and format prompt
-        prompt_template = ChatPromptTemplate.from_messages(messages)
-        return prompt_template.format(chatbot_name=chatbot_name, user_input=user_input)
\ No newline at end of file
+
+        return tuple(prefix)
\ No newline at end of file
@@ -6,9 +6,9 @@ from dataclasses import dataclass, field
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationMessage:
-    """Single message in conversation"""
+    """Single message in conversation (slotted: no per-instance __dict__)"""
     role: str  # 'user' or 'assistant'
     content: str
     timestamp: datetime = field(default_factory=datetime.now)
@@ -16,11 +16,16 @@ class ConversationMessage:
 
 
 class ConversationManager:
-    """Manages conversation state and history"""
+    """
+    Manages conversation state and history.
+    The UI view of the history is built once and only extended with the
+    messages added since, so timestamps are formatted once per message.
+    """
     
     def __init__(self, session_id: str = "default"):
         self.session_id = session_id
         self.messages: List[ConversationMessage] = []
+        self._cached_view: List[Dict[str, str]] = []
         self.response_type = "standard"
         
     def add_user_message(self, content: str) -> None:
@@ -43,18 +48,25 @@ class ConversationManager:
         
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """Get conversation history in format suitable for UI"""
-        return [
+        start = len(self._cached_view)
+        if start > len(self.messages):
+            # Messages were removed directly from the list: build the view again
+            self._cached_view, start = [], 0
+        self._cached_view.extend(
             {
                 "role": msg.role,
                 "content": msg.content,
                 "timestamp": msg.timestamp.isoformat()
             }
-            for msg in self.messages
-        ]
+            for msg in self.messages[start:]
+        )
+        # A copy, so callers cannot change the cached view
+        return list(self._cached_view)
         
     def clear_conversation(self) -> None:
         """Clear conversation history"""
         self.messages.clear()
+        self._cached_view.clear()
         
     def set_response_type(self, response_type: str) -> None:
         """Set response type for future messages"""
@@ -0,0 +1,98 @@
+"""
+Semantic response cache independent of UI framework.
+Returns a cached answer when a new question means the same as an
+already answered one, not only when it is byte-identical.
+"""
+import threading
+from typing import Any, Hashable, Optional
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # optional: plain NumPy is used instead
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _masked_scores(matrix, key_ids, vector, key_id, out):
+        """Dot product of every row with vector (rows with another key score -1), in parallel"""
+        for row in prange(out.shape[0]):
+            if key_ids[row] != key_id:
+                out[row] = -1.0
+            else:
+                acc = np.float32(0.0)
+                for col in range(vector.shape[0]):
+                    acc += matrix[row, col] * vector[col]
+                out[row] = acc
+
+
+class SemanticCache:
+    """Embedding-similarity cache of chatbot responses"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", threshold: float = 0.92):
+        self.model_name = model_name
+        self.threshold = threshold
+        self._encoder: Any = None          # loaded on first use
+        self._matrix: Optional[np.ndarray] = None   # normalized embeddings (C-contiguous fp32), one row per entry
+        self._key_ids: Optional[np.ndarray] = None  # key id of each row
+        self._scores: Optional[np.ndarray] = None   # reusable score buffer for the Numba kernel
+        self._keys: dict = {}
+        self._responses: list = []
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> np.ndarray:
+        """Encode text into a normalized embedding"""
+        if self._encoder is None:
+            from sentence_transformers import SentenceTransformer
+            self._encoder = SentenceTransformer(self.model_name)
+        return self._encoder.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    def lookup(self, vector: np.ndarray, key: Hashable = None) -> Optional[str]:
+        """Return the response cached for the most similar text with the same key, if similar enough"""
+        vector = np.ascontiguousarray(vector, dtype=np.float32)
+        # Under the lock: a concurrent clear() or insert() may swap the arrays, and
+        # the Numba path writes into the shared score buffer
+        with self._lock:
+            size = len(self._responses)
+            if not size or key not in self._keys:
+                return None
+
+            if njit is not None:
+                scores = self._scores[:size]
+                _masked_scores(self._matrix[:size], self._key_ids[:size], vector, self._keys[key], scores)
+            else:
+                # A single (BLAS) matrix-vector product scores every cached entry
+                scores = self._matrix[:size] @ vector
+                scores[self._key_ids[:size] != self._keys[key]] = -1.0
+            best = int(np.argmax(scores))
+            return self._responses[best] if scores[best] >= self.threshold else None
+
+    def insert(self, vector: np.ndarray, response: str, key: Hashable = None) -> None:
+        """Add an embedding and its response to the cache"""
+        with self._lock:
+            size = len(self._responses)
+            if self._matrix is None:
+                self._matrix = np.empty((64, vector.shape[0]), dtype=np.float32)
+                self._key_ids = np.empty(64, dtype=np.int32)
+                self._scores = np.empty(64, dtype=np.float32)
+            elif size == self._matrix.shape[0]:
+                # Grow by doubling so inserts stay cheap on average
+                self._matrix = np.concatenate([self._matrix, np.empty_like(self._matrix)])
+                self._key_ids = np.concatenate([self._key_ids, np.empty_like(self._key_ids)])
+                self._scores = np.empty(self._matrix.shape[0], dtype=np.float32)
+
+            self._matrix[size] = vector
+            self._key_ids[size] = self._keys.setdefault(key, len(self._keys))
+            self._responses.append(response)
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock:
+            self._matrix = None
+            self._key_ids = None
+            self._scores = None
+            self._keys.clear()
+            self._responses.clear()
+
+    def __len__(self) -> int:
+        return len(self._responses)
@@ -0,0 +1,93 @@
+"""
+Tests for BatchedInferencer.
+Run from 5_Chatbot_v2.0: python -m unittest discover -s test
+"""
+import asyncio
+import unittest
+from langchain_core.runnables import RunnableLambda
+from src.batched_inferencer import BatchedInferencer
+
+
+class SlowModel:
+    """Runnable stand-in that takes `delay` seconds per batch and tracks overlap"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.batches = []
+        self.runnable = RunnableLambda(self._call, afunc=self._acall)
+
+    def _call(self, text):
+        raise AssertionError("BatchedInferencer should only use the async path")
+
+    async def _acall(self, text):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.batches.append(text)
+        try:
+            await asyncio.sleep(self.delay)
+            return text.upper()
+        finally:
+            self.active -= 1
+
+
+class BatchedInferencerTest(unittest.TestCase):
+
+    def test_concurrent_submits_share_results(self):
+        model = SlowModel(delay=0.05)
+        inferencer = BatchedInferencer(max_wait=0.02)
+
+        async def run():
+            return await asyncio.gather(
+                inferencer.submit(model.runnable, "a", {}),
+                inferencer.submit(model.runnable, "b", {}),
+            )
+
+        self.assertEqual(asyncio.run(run()), ["A", "B"])
+
+    def test_staggered_submits_overlap(self):
+        # The second call arrives after the first batch closed; it must not wait
+        # for the first generation to finish before its own batch starts
+        model = SlowModel(delay=0.3)
+        inferencer = BatchedInferencer(max_wait=0.02)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            first = asyncio.create_task(inferencer.submit(model.runnable, "first", {}))
+            await asyncio.sleep(0.05)
+            second = await inferencer.submit(model.runnable, "second", {})
+            return await first, second, loop.time() - start
+
+        first, second, elapsed = asyncio.run(run())
+        self.assertEqual((first, second), ("FIRST", "SECOND"))
+        self.assertEqual(model.max_active, 2)
+        self.assertLess(elapsed, 0.5)
+
+    def test_errors_reach_only_their_caller(self):
+        def fail_on_bad(text):
+            if text == "bad":
+                raise ValueError("bad input")
+            return text
+
+        async def afail_on_bad(text):
+            return fail_on_bad(text)
+
+        runnable = RunnableLambda(fail_on_bad, afunc=afail_on_bad)
+        inferencer = BatchedInferencer(max_wait=0.02)
+
+        async def run():
+            return await asyncio.gather(
+                inferencer.submit(runnable, "good", {}),
+                inferencer.submit(runnable, "bad", {}),
+                return_exceptions=True,
+            )
+
+        good, bad = asyncio.run(run())
+        self.assertEqual(good, "good")
+        self.assertIsInstance(bad, ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+"""
+Tests for the chatbot service: history window, caches and streaming helpers.
+Run from 5_Chatbot_v2.0: python -m unittest discover -s test
+"""
+import unittest
+from unittest import mock
+import numpy as np
+import yaml
+from langchain_core.messages import AIMessage, HumanMessage
+from src import chatbot
+from src.chatbot import ChatbotService, ChatRequest, WindowedHistory, run_async
+from src.conversation_manager import ConversationManager
+from src.semantic_cache import SemanticCache
+
+
+def exchange(index: int):
+    return [HumanMessage(content=f"question {index}"), AIMessage(content=f"answer {index}")]
+
+
+def load_config(**cache) -> dict:
+    with open("config/settings-example.yaml") as file:
+        config = yaml.safe_load(file)
+    config["cache"].update(cache)
+    return config
+
+
+class WindowedHistoryTest(unittest.TestCase):
+
+    def test_keeps_only_the_last_turns(self):
+        history = WindowedHistory(max_turns=2)
+        for index in range(3):
+            history.add_messages(exchange(index))
+        self.assertEqual([m.content for m in history.messages],
+                         ["question 1", "answer 1", "question 2", "answer 2"])
+
+    def test_zero_turns_keeps_nothing(self):
+        history = WindowedHistory(max_turns=0)
+        for index in range(3):
+            history.add_messages(exchange(index))
+        self.assertEqual(history.messages, [])
+
+
+class ResponseKeyTest(unittest.TestCase):
+
+    def test_key_depends_on_prompt_and_temperature(self):
+        prompt = [HumanMessage(content="Hello")]
+        key = ChatbotService._response_key(prompt, 0.2)
+        self.assertEqual(key, ChatbotService._response_key([HumanMessage(content="Hello")], 0.2))
+        self.assertNotEqual(key, ChatbotService._response_key(prompt, 0.3))
+        self.assertNotEqual(key, ChatbotService._response_key([HumanMessage(content="hello")], 0.2))
+
+
+class GetResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+        async def invoke(full_prompt, temperature, session_id):
+            self.calls.append(full_prompt[-1].content)
+            content = f"reply {len(self.calls)}"
+            self.service.get_session_history(session_id).add_messages([full_prompt[-1], AIMessage(content=content)])
+            return content
+
+        self.service = ChatbotService(load_config())
+        self.service._invoke_response = invoke
+
+    def ask(self, text: str, session_id: str, temperature: float = 0.2):
+        request = ChatRequest(user_input=text, temperature=temperature, session_id=session_id)
+        return run_async(self.service.get_response(request))
+
+    def test_first_turn_answer_is_reused_by_other_sessions(self):
+        self.ask("hello", "a")
+        response = self.ask("hello", "b")
+        self.assertEqual(response.message, "reply 1")
+        self.assertTrue(response.metadata["cached"])
+        self.assertEqual(len(self.calls), 1)
+
+    def test_cache_hit_is_recorded_in_the_history(self):
+        self.ask("hello", "a")
+        self.ask("hello", "b")
+        self.assertEqual([m.content for m in self.service.get_session_history("b").messages][-1], "reply 1")
+
+    def test_follow_up_turns_are_not_cached(self):
+        self.ask("hello", "a")
+        self.ask("why?", "a")
+        self.ask("hello", "b")
+        self.ask("why?", "b")
+        self.assertEqual(self.calls, ["hello", "why?", "why?"])
+
+    def test_high_temperature_answers_are_not_cached(self):
+        self.ask("hello", "a", temperature=1.0)
+        self.ask("hello", "b", temperature=1.0)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.service.RESPONSE_CACHE_SIZE = 1
+        self.ask("a", "s1")
+        self.ask("b", "s2")
+        self.ask("a", "s3")
+        self.assertEqual(self.calls, ["a", "b", "a"])
+
+    def test_semantic_cache_is_opt_in(self):
+        self.assertIsNone(self.service.semantic_cache)
+        self.assertIsNotNone(ChatbotService(load_config(semantic=True)).semantic_cache)
+        self.assertIsNone(ChatbotService(load_config(enabled=False, semantic=True)).semantic_cache)
+
+    def test_encoder_failure_falls_back_to_the_model(self):
+        self.service.semantic_cache = SemanticCache()
+        with mock.patch.object(SemanticCache, "embed", side_effect=ImportError("no sentence-transformers")):
+            response = self.ask("hello", "a")
+        self.assertEqual(response.message, "reply 1")
+
+
+class SemanticCacheTest(unittest.TestCase):
+
+    def test_lookup_only_matches_the_same_key(self):
+        cache = SemanticCache(threshold=0.9)
+        vector = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+        cache.insert(vector, "standard answer", "standard")
+
+        self.assertEqual(cache.lookup(vector, "standard"), "standard answer")
+        self.assertIsNone(cache.lookup(vector, "factual"))
+        self.assertIsNone(cache.lookup(np.array([0.0, 1.0, 0.0], dtype=np.float32), "standard"))
+
+
+class StreamingHelpersTest(unittest.TestCase):
+
+    def test_coalesce_yields_the_first_text_then_joins_the_rest(self):
+        self.assertEqual(list(chatbot._coalesce(["a", "b", "c"], interval=60)), ["a", "bc"])
+
+    def test_short_input_is_not_truncated(self):
+        service = ChatbotService(load_config())
+        request = ChatRequest(user_input="hello")
+        self.assertEqual(service._apply_token_budget(request), (request, False))
+
+    def test_long_input_is_truncated_without_a_tokenizer(self):
+        service = ChatbotService(load_config())
+        service._tokenizer = False
+        request, truncated = service._apply_token_budget(ChatRequest(user_input="x" * (chatbot.MAX_USER_TOKENS * 5)))
+        self.assertTrue(truncated)
+        self.assertEqual(len(request.user_input), chatbot.MAX_USER_TOKENS * 4)
+
+
+class ConversationManagerTest(unittest.TestCase):
+
+    def test_messages_is_the_stored_list(self):
+        manager = ConversationManager()
+        manager.add_user_message("hello")
+        self.assertEqual(len(manager.get_conversation_history()), 1)
+        manager.messages.pop()
+        self.assertEqual(manager.get_conversation_history(), [])
+
+    def test_history_is_a_copy(self):
+        manager = ConversationManager()
+        manager.add_user_message("hello")
+        manager.get_conversation_history().clear()
+        manager.add_assistant_message("hi")
+        self.assertEqual([m["content"] for m in manager.get_conversation_history()], ["hello", "hi"])
+
+
+if __name__ == "__main__":
+    unittest.main()
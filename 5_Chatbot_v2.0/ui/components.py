@@ -3,7 +3,7 @@ Pure Streamlit UI components with no AI logic
 """
 import streamlit as st
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from src import ChatbotService, ChatRequest, ConversationManager
 
 
@@ -45,10 +45,11 @@ class PageConfigComponent(UIComponent):
 class SidebarComponent(UIComponent):
     """Renders sidebar controls"""
     
-    def __init__(self, config: Dict[str, Any], conversation_manager: ConversationManager):
+    def __init__(self, config: Dict[str, Any], conversation_manager: ConversationManager,
+                 chatbot_service: Optional[ChatbotService] = None):
         self.config = config
         self.conversation_manager = conversation_manager
-        super().__init__(None, conversation_manager)
+        super().__init__(chatbot_service, conversation_manager)
 
     def render(self):
         """Render enhanced sidebar with collapsible sections and controls"""
@@ -77,8 +78,9 @@ class SidebarComponent(UIComponent):
             # Clear conversation button
             if st.button("Clear Conversation", type="secondary"):
                 self.conversation_manager.clear_conversation()
-                if 'messages' in st.session_state:
-                    st.session_state.messages = []
+                # The service outlives reruns, so its history for this session is dropped too
+                if self.chatbot_service is not None:
+                    self.chatbot_service.clear_session(self.conversation_manager.session_id)
                 st.rerun()
 
             return response_type
@@ -94,31 +96,34 @@ class ChatInterface(UIComponent):
         self.factual_temperature = self.config['ai_model']['factual_temperature']
         self.creative_temperature = self.config['ai_model']['creative_temperature']
         self.default_temperature = self.config['ai_model']['default_temperature']
+        self._temp_map = {
+            'standard': self.standard_temperature,
+            'creative': self.creative_temperature,
+            'factual': self.factual_temperature
+        }
         super().__init__(chatbot_service, conversation_manager)
 
+    # @st.fragment reruns only the chat when a message is sent,
+    # instead of the whole script (page config and sidebar)
+    @st.fragment
     def render(self, response_type: str):
         """Render the main chat interface"""
-        # Initialize session state
-        if 'messages' not in st.session_state:
-            st.session_state.messages = []
-        
         # Display chat messages
         self._display_chat_history()
         
         # Chat input
-        if prompt := st.chat_input("What would you like to know?"):
+        if (prompt := st.chat_input("What would you like to know?")) and prompt.strip():
             self._handle_user_input(prompt, response_type)
     
     def _display_chat_history(self):
         """Display conversation history"""
-        for message in st.session_state.messages:
+        for message in self.conversation_manager.get_conversation_history():
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
     
     def _handle_user_input(self, user_input: str, response_type: str):
         """Handle user input and generate response"""
-        # Add user message to session state
-        st.session_state.messages.append({"role": "user", "content": user_input})
+        # Add user message to the conversation
         self.conversation_manager.add_user_message(user_input)
         
         # Display user message
@@ -131,18 +136,8 @@ class ChatInterface(UIComponent):
 
     def _generate_and_display_streaming_response(self, user_input: str, response_type: str):
         """Generate response from AI service and display with streaming"""
-        try:   
-            print(f"_generate_and_display_streaming_response::Response type set to: {response_type}")
-            if response_type == 'standard':
-                temp = self.standard_temperature
-            elif response_type == 'creative':
-                temp = self.creative_temperature
-            elif response_type == 'factual':
-                temp = self.factual_temperature
-            else:
-                temp = self.default_temperature  # default
-            
-            print(f"_generate_and_display_streaming_response::Response type set to: {temp}")
+        try:
+            temp = self._temp_map.get(response_type, self.default_temperature)
 
             # Create request
             request = ChatRequest(
@@ -158,12 +153,11 @@ class ChatInterface(UIComponent):
             # Stream the response using st.write_stream
             response_content = st.write_stream(response_generator)
             
-            # Add to session state and conversation manager
-            st.session_state.messages.append({"role": "assistant", "content": response_content})
+            # Add to the conversation
             self.conversation_manager.add_assistant_message(response_content, {})
             
         except Exception as e:
             error_msg = f"Error: {str(e)}"
             st.error(error_msg)
-            st.session_state.messages.append({"role": "assistant", "content": error_msg})
+            self.conversation_manager.add_assistant_message(error_msg, {"error": str(e)})
 
@@ -2,12 +2,15 @@
 Main Streamlit application entry point.
 Orchestrates UI components and AI services with dependency injection.
 """
+import logging
 import streamlit as st
 import yaml
 from pathlib import Path
 from src import ChatbotService, ConversationManager
 from ui import PageConfigComponent, SidebarComponent, ChatInterface
 
+logger = logging.getLogger(__name__)
+
 def validate_config_structure(config: dict) -> None:
     """Validate that configuration contains all required keys"""
     required_keys = {
@@ -72,7 +75,7 @@ def main():
     
     # Render sidebar and get settings
     res_type = sidebar.render()
-    print(f"Selected response type: {res_type}")
+    logger.debug("Selected response type: %s", res_type)
 
     # Render main chat interface
     chat_interface.render(res_type)
@@ -3,12 +3,21 @@ Main Streamlit application entry point.
 Orchestrates UI components and AI services with dependency injection.
 Modified to support persistent database configuration for chat history.
 """
+import logging
+import uuid
 import streamlit as st
 import yaml
 from pathlib import Path
+
+try:
+    from yaml import CSafeLoader as YamlLoader  # libyaml bindings, much faster when available
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 from src import ChatbotService, ConversationManager
 from ui import PageConfigComponent, SidebarComponent, ChatInterface
 
+logger = logging.getLogger(__name__)
+
 def validate_config_structure(config: dict) -> None:
     """Validate that configuration contains all required keys"""
     required_keys = {
@@ -29,7 +38,7 @@ def validate_config_structure(config: dict) -> None:
 
 
 def load_config() -> dict:
-    """Load configuration from YAML file"""
+    """Load configuration from YAML file, parsed again only when the file changes"""
     config_path = Path("config/settings.yaml")
     
     if not config_path.exists():
@@ -37,23 +46,41 @@ def load_config() -> dict:
             f"Configuration file not found: {config_path}. "
             "Please create settings.yaml with required configuration."
         )
-    
+
+    # The modification time is part of the cache key, so edits are picked up on the next rerun
+    return _parse_config(str(config_path), config_path.stat().st_mtime_ns)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _parse_config(path: str, mtime: int) -> dict:
+    """Parse and validate the YAML configuration of a given modification time"""
     try:
-        with open(config_path, 'r') as file:
-            config = yaml.safe_load(file)
+        with open(path, 'r') as file:
+            config = yaml.load(file, Loader=YamlLoader)
             
         # Validate required keys exist
         validate_config_structure(config)
-        return config
         
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML in configuration file: {e}")
+    
+    return config
+
+@st.cache_resource(show_spinner=False)
+def get_chatbot_service(config: dict) -> ChatbotService:
+    """Create the chatbot service once per server process instead of on every rerun"""
+    return ChatbotService(config)
+
 
 def initialize_services(config: dict) -> tuple:
     """Initialize all services with dependency injection"""
-    chatbot_service = ChatbotService(config)
-    conversation_manager = ConversationManager()
-    return chatbot_service, conversation_manager
+    chatbot_service = get_chatbot_service(config)
+
+    # The service is shared by all browser sessions, so each session keeps its
+    # own conversation manager (and history key) in session_state
+    if 'conversation_manager' not in st.session_state:
+        st.session_state.conversation_manager = ConversationManager(session_id=uuid.uuid4().hex)
+    return chatbot_service, st.session_state.conversation_manager
 
 
 def main():
@@ -70,11 +97,11 @@ def main():
     
     # Create UI components
     chat_interface = ChatInterface(config, chatbot_service, conversation_manager)
-    sidebar = SidebarComponent(config, conversation_manager)
+    sidebar = SidebarComponent(config, conversation_manager, chatbot_service)
     
     # Render sidebar and get settings
     res_type = sidebar.render()
-    print(f"Selected response type: {res_type}")
+    logger.debug("Selected response type: %s", res_type)
 
     # Render main chat interface
     chat_interface.render(res_type)
@@ -3,8 +3,9 @@ Core source code package for the chatbot application.
 
 This package contains the main business logic and AI service components.
 """
-from .chatbot import ChatbotService, ChatRequest, ChatResponse, PromptService
+from .chatbot import ChatbotService, ChatRequest, ChatResponse, PromptError, PromptService, iterate_async, run_async
 from .conversation_manager import ConversationManager, ConversationMessage
+from .semantic_cache import SemanticCache
 #from .nlp_utils import TextProcessor, IntentClassifier, EntityExtractor
 #from .api_utils import APIClient, ModelAPIAdapter, ExternalServiceIntegration
 
@@ -16,11 +17,17 @@ __all__ = [
     'ChatRequest', 
     'ChatResponse',
     'PromptService',
+    'PromptError',
+    'iterate_async',
+    'run_async',
     
     # Conversation management
     'ConversationManager',
     'ConversationMessage',
     
+    # Response caching
+    'SemanticCache',
+    
     # NLP utilities
     'TextProcessor',
     'IntentClassifier', 
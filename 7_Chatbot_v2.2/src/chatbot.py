@@ -2,8 +2,15 @@
 Pure AI service layer with no Streamlit dependencies.
 Handles all AI model interactions and business logic.
 """
+import asyncio
+import logging
+import queue
+import threading
+from collections import OrderedDict, deque
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from operator import attrgetter
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Dict, Any, Sequence, Tuple
 from langchain_ollama import ChatOllama
 from langchain_classic.prompts import (
     ChatPromptTemplate,
@@ -11,17 +18,181 @@ from langchain_classic.prompts import (
     HumanMessagePromptTemplate,
     AIMessagePromptTemplate
 )
-from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, SystemMessage
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
 from langchain.agents import create_agent
 from langchain_community.tools import DuckDuckGoSearchRun
 from langchain.tools import tool
+from .semantic_cache import SemanticCache
 import certifi, os
 
+logger = logging.getLogger(__name__)
+
 # Set up SSL certificates
 os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
 
+# One long-lived event loop for async calls from Streamlit's synchronous script
+_event_loop = asyncio.new_event_loop()
+threading.Thread(target=_event_loop.run_forever, daemon=True).start()
+
+
+def run_async(coroutine):
+    """Run a coroutine on the shared background event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coroutine, _event_loop).result()
+
+
+def iterate_async(async_iterator: AsyncIterator) -> Iterator:
+    """Consume an async iterator on the shared background event loop from synchronous code"""
+    items: queue.Queue = queue.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for item in async_iterator:
+                items.put((item, None))
+        except Exception as e:
+            items.put((done, e))
+        else:
+            items.put((done, None))
+
+    future = asyncio.run_coroutine_threadsafe(pump(), _event_loop)
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        # Stop the producer if the consumer stopped early (e.g. a Streamlit rerun)
+        future.cancel()
+
+
+# Concurrent web searches allowed across all agent runs
+_SEARCH_SLOTS = asyncio.Semaphore(4)
+
+
+@lru_cache(maxsize=1)
+def _shared_search() -> DuckDuckGoSearchRun:
+    """One DuckDuckGo search tool (and HTTP session) shared by every ChatbotService"""
+    return DuckDuckGoSearchRun()
+
+
+@tool
+async def internet_search(query: str) -> str:
+    """Search the internet for current and real-time information.
+    
+    Use this when the query involves:
+    - Current events or recent news
+    - Real-time data (stock prices, weather, sports scores)
+    - Information that changes frequently
+    - Factual verification of recent claims
+    """
+
+    # The HTTP request runs in a worker thread so the event loop keeps streaming
+    async with _SEARCH_SLOTS:
+        return await _shared_search().ainvoke(query)
+
+
+def _first_message_content(messages: list) -> Optional[str]:
+    """Content of the first message of an agent update, if any"""
+    return getattr(messages[0], 'content', None) if messages else None
+
+
+_get_content = attrgetter('content')
+
+# (matches, extract) pairs for the chunk formats of the agent stream, tried in order
+_CHUNK_EXTRACTORS = (
+    # Format 1: Dict with 'model' key (agent format)
+    (lambda chunk: isinstance(chunk, dict) and 'model' in chunk,
+     lambda chunk: _first_message_content(chunk['model'].get('messages', []))),
+    # Format 2: Dict with 'messages' key
+    (lambda chunk: isinstance(chunk, dict) and 'messages' in chunk,
+     lambda chunk: _first_message_content(chunk['messages'])),
+    # Format 3: Direct message object
+    (lambda chunk: hasattr(chunk, 'content'), _get_content),
+    # Format 4: String
+    (lambda chunk: isinstance(chunk, str), lambda chunk: chunk)
+)
+
+
+def _extract_content(chunk: Any) -> Optional[str]:
+    """Text content of one agent stream chunk, whatever its format"""
+    for matches, extract in _CHUNK_EXTRACTORS:
+        if matches(chunk):
+            return extract(chunk)
+    return None
+
+
+def _chunk_texts(stream: Iterator) -> Iterator[str]:
+    """Text of each streamed chunk; message chunks are read without a per-chunk hasattr"""
+    for chunk in stream:
+        try:
+            yield _get_content(chunk)
+        except AttributeError:
+            yield str(chunk)
+
+
+_SEARCH_INDICATOR = "\n\n🔍 *Searching the web...*\n\n"
+
+
+def _calls_tools(chunk: Any) -> bool:
+    """Whether the chunk, or the agent update message it wraps, requests tool calls"""
+    if isinstance(chunk, dict):
+        update = chunk.get('model', chunk)
+        messages = update.get('messages') if isinstance(update, dict) else None
+        chunk = messages[0] if messages else None
+    return bool(getattr(chunk, 'tool_calls', None))
+
+
+@lru_cache(maxsize=16)
+def _build_chat_ollama(model_name: str, temperature: float, keep_alive: Optional[str] = None,
+                       num_ctx: Optional[int] = None) -> ChatOllama:
+    """Build the Ollama chat model once per (model, temperature) and reuse it"""
+    return ChatOllama(model=model_name, temperature=temperature, keep_alive=keep_alive, num_ctx=num_ctx)
+
+
+@lru_cache(maxsize=16)
+def _build_huggingface_model(repo: str, api_token: str, temperature: float) -> ChatHuggingFace:
+    """Build the Hugging Face endpoint and chat wrapper once per (repo, temperature) and reuse them"""
+    llm = HuggingFaceEndpoint(
+        repo_id=repo, # Model name
+        huggingfacehub_api_token=api_token,
+        temperature=temperature,
+        streaming=True,
+        do_sample=True
+    )
+
+    return ChatHuggingFace(llm=llm)
+
+
+# llm.backend values served through an OpenAI-compatible /v1/chat/completions API.
+# vLLM and TGI batch concurrent requests continuously on the GPU
+_OPENAI_COMPATIBLE_BACKENDS = {"vllm", "tgi"}
+
+
+@lru_cache(maxsize=16)
+def _build_openai_compatible_model(base_url: str, api_key: str, model: str, temperature: float) -> BaseChatModel:
+    """Build the chat model for a vLLM/TGI server once per (model, temperature) and reuse it"""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        base_url=base_url,
+        api_key=api_key or "EMPTY",
+        model=model,
+        temperature=temperature,
+        streaming=True
+    )
+
+
+class PromptError(ValueError):
+    """Raised when a prompt cannot be built from a chat request"""
+
+
 @dataclass
 class ChatResponse:
     """Structured response from AI service"""
@@ -40,42 +211,122 @@ class ChatRequest:
     session_id: str = "default_session"
 
 
+class WindowedChatHistory(BaseChatMessageHistory):
+    """
+    Chat history kept in a ring buffer of the last `max_turns` exchanges,
+    so the replayed prompt stops growing with the length of the session.
+    With a summarizer, evicted turns are folded into a rolling summary.
+    The exchange that carried the full instructions can be pinned ahead of
+    the window, so follow-up turns only need to send the user's text.
+    """
+
+    # Evicted messages summarized together (4 turns per summarizer call)
+    SUMMARY_BATCH = 8
+
+    def __init__(self, max_turns: int = 10,
+                 summarizer: Optional[Callable[[str, List[BaseMessage]], Awaitable[str]]] = None):
+        self._recent: deque = deque(maxlen=2 * max_turns)
+        self._evicted: List[BaseMessage] = []
+        self._summarizer = summarizer
+        self._summary_lock = asyncio.Lock()   # one summarizer call at a time, each extends the last
+        self._next_summary: Optional[str] = None  # finished summary, published on the next add
+        self.summary = ""
+        self.pinned: List[BaseMessage] = []   # exchange that carried the instructions and examples
+        self.pinned_for: Optional[str] = None  # response type of the pinned instructions
+        self._pin_pending: Optional[Tuple[str, str]] = None  # (full prompt, response type) awaiting its exchange
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        """Pinned exchange, rolling summary (if any), then the recent messages"""
+        if self.summary:
+            return [*self.pinned, SystemMessage(content=f"Summary of the earlier conversation: {self.summary}"), *self._recent]
+        return [*self.pinned, *self._recent]
+
+    def pin_next(self, prompt: Optional[str], response_type: Optional[str] = None) -> None:
+        """Pin the exchange that starts with this full prompt when it is added; None cancels a pending pin"""
+        self._pin_pending = (prompt, response_type) if prompt is not None else None
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Append messages; the oldest fall out of the window"""
+        # A new summary only becomes visible here, never while a turn is running:
+        # RunnableWithMessageHistory strips len(messages) from the turn's input at its end,
+        # so the number of messages must not change in between
+        if self._next_summary is not None:
+            self.summary, self._next_summary = self._next_summary, None
+
+        if self._pin_pending is not None:
+            prompt, response_type = self._pin_pending
+            self._pin_pending = None
+            # Only the exchange of that exact prompt is pinned (an interrupted turn never adds one)
+            if messages and messages[0].content == prompt:
+                self.pinned, messages = list(messages[:2]), messages[2:]
+                self.pinned_for = response_type
+
+        for message in messages:
+            if self._summarizer is not None and len(self._recent) == self._recent.maxlen:
+                self._evicted.append(self._recent[0])
+            self._recent.append(message)
+
+        if len(self._evicted) >= self.SUMMARY_BATCH:
+            evicted, self._evicted = self._evicted, []
+            asyncio.run_coroutine_threadsafe(self._summarize(evicted), _event_loop)
+
+    async def _summarize(self, evicted: List[BaseMessage]) -> None:
+        """Fold evicted messages into the summary in the background"""
+        async with self._summary_lock:
+            latest = self._next_summary if self._next_summary is not None else self.summary
+            try:
+                self._next_summary = await self._summarizer(latest, evicted)
+            except Exception:
+                # Keep the previous summary; the evicted turns are only lost from context
+                logger.warning("Summarizing %d evicted messages failed", len(evicted), exc_info=True)
+
+    def clear(self) -> None:
+        """Remove all messages and the summary"""
+        self._recent.clear()
+        self._evicted.clear()
+        self.summary = ""
+        self._next_summary = None
+        self.pinned = []
+        self.pinned_for = self._pin_pending = None
+
+
 class ChatbotService:
     """Backend service for handling AI model interactions"""
+
+    # Responses kept in the in-process LRU, keyed on (input, temperature, response type)
+    RESPONSE_CACHE_SIZE = 512
+    # Least recently used session histories are dropped beyond this many sessions
+    MAX_SESSIONS = 256
     
     def __init__(self, config: Dict[str, Any]):
-        self.model_name = config['ai_model']['name']
+        # Optional Ollama tag, e.g. a 4-bit build: "3b-instruct-q4_K_M" -> llama3.2:3b-instruct-q4_K_M
+        quantization = config['ai_model'].get('quantization')
+        self.model_name = f"{config['ai_model']['name']}:{quantization}" if quantization else config['ai_model']['name']
+        # Keep the model (and its KV cache) loaded between calls instead of reloading it
+        self.keep_alive = config['ai_model'].get('keep_alive')
+        self.num_ctx = config['ai_model'].get('num_ctx')
         self.chatbot_name = config['chatbot']['name']
         self.repo= config['llm']['repo']
         self.api_token= config['llm']['api_token']
         self.api_endpoint= config['llm']['api_endpoint']
-        self.store: Dict[str, InMemoryChatMessageHistory] = {}
+        self.backend = config['llm'].get('backend', 'huggingface')
+        self.history_turns = config['chatbot'].get('history_turns', 10)
+        self.summarize_history = config['chatbot'].get('summarize_history', False)
+        self.store: "OrderedDict[str, WindowedChatHistory]" = OrderedDict()
         self.search_tools = self._initialize_search_tools()
-        self.agent_executor = None  # Lazy initialization
+        # Search agents (wrapped with session history), built lazily once per (rounded) temperature
+        self._agent_cache: Dict[float, RunnableWithMessageHistory] = {}
+        self._agent_lock = threading.Lock()
+        # History-wrapped streaming models, built once per (rounded) temperature
+        self._chains: Dict[float, RunnableWithMessageHistory] = {}
+        self._resp_cache: "OrderedDict[Tuple[str, float, str], str]" = OrderedDict()
+        # Optional: also answer paraphrases of already answered questions
+        self.semantic_cache = SemanticCache(threshold=0.95) if config['cache'].get('semantic') else None
         
     
     def _initialize_search_tools(self) -> List:
         """Initialize search tools for the agent"""
-        
-        # FIX: Set certificate path
-        os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
-
-        # Create instance ONCE
-        search = DuckDuckGoSearchRun()
-        
-        @tool
-        def internet_search(query: str) -> str:
-            """Search the internet for current and real-time information.
-            
-            Use this when the query involves:
-            - Current events or recent news
-            - Real-time data (stock prices, weather, sports scores)
-            - Information that changes frequently
-            - Factual verification of recent claims
-            """
-
-            return search.run(query)
-        
         return [internet_search]
     
            
@@ -87,32 +338,62 @@ class ChatbotService:
 
         return agent
     
+    def _get_agent(self, temperature: float) -> RunnableWithMessageHistory:
+        """Return the search agent for a temperature, creating it only once even under concurrent reruns"""
+        key = round(float(temperature), 2)
+        agent = self._agent_cache.get(key)
+        if agent is None:
+            with self._agent_lock:
+                agent = self._agent_cache.get(key)
+                if agent is None:
+                    agent = self._agent_cache[key] = RunnableWithMessageHistory(
+                        self._create_agent(key),
+                        self.get_session_history,
+                        input_messages_key="messages",
+                        history_messages_key="history"
+                    )
+        return agent
+
     def get_model(self, temperature: float) -> ChatOllama:
         """Return the current AI model with specified temperature setting"""
-        return ChatOllama(
-            model=self.model_name,
-            temperature=float(temperature)
-        )
+        return _build_chat_ollama(self.model_name, round(float(temperature), 3), self.keep_alive, self.num_ctx)
 
-    def get_huggingface_model(self, temperature: float) -> ChatHuggingFace:
+    def get_huggingface_model(self, temperature: float) -> BaseChatModel:
         """
         Return the Hugging Face LLM wrapper compatible with LangChain.
+        With llm.backend set to vllm or tgi, the repo is served from
+        api_endpoint through its OpenAI-compatible API instead.
         """
-        llm = HuggingFaceEndpoint(
-            repo_id=self.repo, # Model name
-            huggingfacehub_api_token=self.api_token,
-            temperature=temperature,
-            streaming=True,
-            do_sample=True
-        )
+        temperature = round(float(temperature), 3)
+        if self.backend in _OPENAI_COMPATIBLE_BACKENDS:
+            return _build_openai_compatible_model(self.api_endpoint, self.api_token, self.repo, temperature)
+        return _build_huggingface_model(self.repo, self.api_token, temperature)
 
-        return ChatHuggingFace(llm=llm)
+    def clear_session(self, session_id: str) -> None:
+        """Forget the model-side history (turns, pinned prompt and summary) of a session"""
+        self.store.pop(session_id, None)
 
-    def get_session_history(self, session_id: str) -> InMemoryChatMessageHistory:
+    def get_session_history(self, session_id: str) -> WindowedChatHistory:
         """Get or create session history for conversation management"""
-        if session_id not in self.store:
-            self.store[session_id] = InMemoryChatMessageHistory()
-        return self.store[session_id]       
+        history = self.store.get(session_id)
+        if history is None:
+            summarizer = self._summarize_history if self.summarize_history else None
+            history = self.store[session_id] = WindowedChatHistory(self.history_turns, summarizer)
+            if len(self.store) > self.MAX_SESSIONS:
+                self.store.popitem(last=False)
+        else:
+            self.store.move_to_end(session_id)
+        return history
+
+    async def _summarize_history(self, summary: str, messages: List[BaseMessage]) -> str:
+        """Fold older turns into the running summary with a cheap local model call"""
+        transcript = "\n".join(f"{message.type}: {message.content}" for message in messages)
+        prompt = (
+            "Extend the summary of this conversation with the new lines. Answer with the summary only, in a few sentences.\n\n"
+            f"Current summary: {summary or '(none)'}\n\nNew lines:\n{transcript}"
+        )
+        response = await self.get_model(0.3).ainvoke(prompt)
+        return response.content
     
     # Needed for local model for streaming
     def _get_streaming_response(self, full_prompt: str, temperature: float, session_id: str):
@@ -126,33 +407,54 @@ class ChatbotService:
             config={"configurable": {"session_id": session_id}}
         )
 
+    def _history_chain(self, temperature: float) -> RunnableWithMessageHistory:
+        """Hugging Face model wrapped with session history, reused across requests"""
+        key = round(float(temperature), 3)
+        chain = self._chains.get(key)
+        if chain is None:
+            chain = self._chains[key] = RunnableWithMessageHistory(
+                self.get_huggingface_model(key), self.get_session_history
+            )
+        return chain
+
+    def _prepare(self, request: ChatRequest) -> Tuple[str, Dict[str, Any]]:
+        """Build the prompt and config for a request; raises PromptError if the prompt fails"""
+        history = self.get_session_history(request.session_id)
+        if history.pinned and history.pinned_for == request.response_type:
+            # Follow-up turn: instructions and examples are already pinned in the history
+            full_prompt = request.user_input
+            history.pin_next(None)
+        else:
+            try:
+                full_prompt = PromptService.create_prompt(
+                    request.user_input, 
+                    request.response_type, 
+                    self.chatbot_name
+                )
+            except (KeyError, ValueError) as e:
+                raise PromptError(str(e)) from e
+            history.pin_next(full_prompt, request.response_type)
+
+        config = {"configurable": {"session_id": request.session_id}}
+        return full_prompt, config
+
+    def _run(self, full_prompt: str, config: Dict[str, Any], temperature: float) -> Iterator:
+        """Stream the model output for a prepared request"""
+        chain = self._history_chain(temperature)
+        return chain.stream(input=full_prompt, config=config)
+
     # Needed for hugging face model for streaming
     def _get_huggingface_streaming_response(self, full_prompt: str, temperature: float, session_id: str):
         """Internal streaming response method (not cached)"""
-        chat_model = self.get_huggingface_model(temperature)
-        chat_with_history = RunnableWithMessageHistory(chat_model, self.get_session_history)
-        
-        # Use stream for streaming responses
-        return chat_with_history.stream(
-            input=full_prompt,
-            config={"configurable": {"session_id": session_id}}
-        )
+        config = {"configurable": {"session_id": session_id}}
+        return self._run(full_prompt, config, temperature)
     
-    def _get_huggingface_streaming_response_with_search(self, full_prompt: str, temperature: float, session_id: str):
-        """Internal streaming response with search tools (HuggingFace)"""
+    def _get_huggingface_streaming_response_with_search(self, full_prompt: str, temperature: float, session_id: str) -> AsyncIterator:
+        """Internal async streaming response with search tools (HuggingFace)"""
         
-        # Get unwrapped agent
-        if not self.agent_executor:
-            self.agent_executor = self._create_agent(temperature)
-        
-        agent_with_history = RunnableWithMessageHistory(
-            self.agent_executor,
-            self.get_session_history,
-            input_messages_key="messages",
-            history_messages_key="history"
-        )
+        agent_with_history = self._get_agent(temperature)
     
-        return agent_with_history.stream(
+        return agent_with_history.astream(
             {
                 "messages": [{"role": "user", "content": full_prompt}]
             },
@@ -170,14 +472,14 @@ class ChatbotService:
             yield "Please provide input for the chatbot."
             return
         
+        # Prompt problems are reported apart from model/network errors
         try:
-            # Create full prompt using prompt service
-            full_prompt = PromptService.create_prompt(
-                request.user_input, 
-                request.response_type, 
-                self.chatbot_name
-            )
+            full_prompt, config = self._prepare(request)
+        except PromptError as e:
+            yield f"Error building prompt: {str(e)}"
+            return
 
+        try:
             #####    code to use local model for streaming  #####
             # # Get streaming response (no caching for streams)
             # stream = self._get_streaming_response(
@@ -188,23 +490,168 @@ class ChatbotService:
             #####    code to use local model for streaming  #####
 
             # Get streaming response (no caching for streams)
-            stream = self._get_huggingface_streaming_response(
-                full_prompt, 
-                request.temperature,
-                request.session_id
-            )
+            stream = self._run(full_prompt, config, request.temperature)
 
             # Yield each chunk from the stream
-            for chunk in stream:
-                if hasattr(chunk, 'content'):
-                    yield chunk.content
-                else:
-                    yield str(chunk)
+            yield from _chunk_texts(stream)
                     
         except Exception as e:
             yield f"Error generating response: {str(e)}"
 
-    def get_response_with_search(self, request: ChatRequest):
+    def _get_cached_response(self, key: Tuple[str, float, str]) -> Optional[str]:
+        """Return the cached response for key, marking it as recently used"""
+        content = self._resp_cache.get(key)
+        if content is not None:
+            self._resp_cache.move_to_end(key)
+        return content
+
+    def _cache_response(self, key: Tuple[str, float, str], content: str) -> None:
+        """Store a response, evicting the least recently used beyond RESPONSE_CACHE_SIZE"""
+        self._resp_cache[key] = content
+        self._resp_cache.move_to_end(key)
+        if len(self._resp_cache) > self.RESPONSE_CACHE_SIZE:
+            self._resp_cache.popitem(last=False)
+
+    async def _aget_single_response(self, request: ChatRequest) -> ChatResponse:
+        """Generate one non-streaming response without session history (cached)"""
+        if not request.user_input:
+            return ChatResponse(
+                message="Please provide input for the chatbot.",
+                confidence=0.0,
+                response_type=request.response_type
+            )
+
+        try:
+            key = (request.user_input, round(float(request.temperature), 2), request.response_type)
+            content = self._get_cached_response(key)
+            query_vector = None
+            if content is None and self.semantic_cache is not None:
+                query_vector = await asyncio.to_thread(self.semantic_cache.embed, request.user_input)
+                content = self.semantic_cache.lookup(query_vector, request.response_type)
+            if content is not None:
+                return ChatResponse(
+                    message=content,
+                    response_type=request.response_type,
+                    metadata={"temperature": request.temperature, "model": self.repo, "cached": True}
+                )
+
+            full_prompt = PromptService.create_prompt(
+                request.user_input,
+                request.response_type,
+                self.chatbot_name
+            )
+            response = await self.get_huggingface_model(request.temperature).ainvoke(full_prompt)
+
+            self._cache_response(key, response.content)
+            if query_vector is not None:
+                self.semantic_cache.insert(query_vector, response.content, request.response_type)
+
+            return ChatResponse(
+                message=response.content,
+                response_type=request.response_type,
+                metadata={"temperature": request.temperature, "model": self.repo}
+            )
+        except Exception as e:
+            return ChatResponse(
+                message=f"Error generating response: {str(e)}",
+                confidence=0.0,
+                response_type=request.response_type,
+                metadata={"error": str(e)}
+            )
+
+    async def aget_responses(self, requests: List[ChatRequest]) -> List[ChatResponse]:
+        """
+        Generate responses for several independent requests concurrently, e.g. the
+        same input once per response type, so the wait is the slowest response
+        instead of the sum of all of them.
+        From synchronous code call it as run_async(service.aget_responses(requests))
+        """
+        return list(await asyncio.gather(*(self._aget_single_response(request) for request in requests)))
+
+    def batch_responses(self, requests: List[ChatRequest]) -> List[str]:
+        """
+        Generate non-streaming responses for several requests (no session history)
+        with one Runnable.batch call per temperature: LangChain sends the prompts
+        concurrently and the endpoint can batch them server-side.
+        """
+        results = ["Please provide input for the chatbot."] * len(requests)
+        prompts: Dict[int, str] = {}
+        groups: Dict[float, List[int]] = {}
+        for index, request in enumerate(requests):
+            if request.user_input:
+                prompts[index] = PromptService.create_prompt(request.user_input, request.response_type, self.chatbot_name)
+                groups.setdefault(round(float(request.temperature), 3), []).append(index)
+
+        for temperature, indexes in groups.items():
+            outputs = self.get_huggingface_model(temperature).batch(
+                [prompts[index] for index in indexes],
+                config={"max_concurrency": len(indexes)},
+                return_exceptions=True
+            )
+            for index, output in zip(indexes, outputs):
+                results[index] = f"Error generating response: {output}" if isinstance(output, Exception) else output.content
+        return results
+
+    def get_responses_all_types(self, user_input: str, temperature: float) -> Optional[Dict[str, str]]:
+        """
+        Answer the same input in every response type (standard, factual, creative)
+        with a single batched model call, e.g. to compare the personalities side by side.
+        """
+        if not user_input:
+            return None
+
+        response_types = ("standard", "factual", "creative")
+        requests = [ChatRequest(user_input, temperature, response_type) for response_type in response_types]
+        return dict(zip(response_types, self.batch_responses(requests)))
+
+    def stream_responses(self, requests: List[ChatRequest]) -> Iterator[Tuple[int, str]]:
+        """
+        Stream several independent requests at the same time (no session history).
+        Yields (request index, text chunk) pairs in arrival order across all
+        streams, so e.g. one column per response type fills in parallel.
+        """
+        chunks: queue.Queue = queue.Queue()
+
+        async def produce(index: int, request: ChatRequest):
+            try:
+                if not request.user_input:
+                    chunks.put((index, "Please provide input for the chatbot."))
+                    return
+                full_prompt = PromptService.create_prompt(
+                    request.user_input,
+                    request.response_type,
+                    self.chatbot_name
+                )
+                async for chunk in self.get_huggingface_model(request.temperature).astream(full_prompt):
+                    chunks.put((index, chunk.content))
+            except Exception as e:
+                chunks.put((index, f"Error generating response: {str(e)}"))
+            finally:
+                chunks.put((index, None))  # end of this stream
+
+        async def start() -> List[asyncio.Task]:
+            return [asyncio.create_task(produce(index, request)) for index, request in enumerate(requests)]
+
+        async def stop(tasks: List[asyncio.Task]):
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        tasks = run_async(start())
+        remaining = len(requests)
+        try:
+            while remaining:
+                index, text = chunks.get()
+                if text is None:
+                    remaining -= 1
+                elif text:
+                    yield index, text
+        finally:
+            # Stop the producers if the consumer stopped early (e.g. a Streamlit rerun or a break)
+            if remaining:
+                run_async(stop(tasks))
+
+    def get_response_with_search(self, request: ChatRequest) -> Iterator[str]:
         """
         Generate streaming AI responses with internet search capabilities.
         Returns generator that yields response chunks.
@@ -212,12 +659,22 @@ class ChatbotService:
         
         This method follows the same streaming pattern as get_response_stream()
         but uses LangChain agents with search tools instead of direct LLM calls.
+        The agent runs on the shared event loop (see aget_response_with_search).
+        """
+        yield from iterate_async(self.aget_response_with_search(request))
+
+    async def aget_response_with_search(self, request: ChatRequest) -> AsyncIterator[str]:
+        """
+        Async version of get_response_with_search.
+        Searches run as async tool calls, so decoding and other sessions'
+        streams continue while the HTTP requests are in flight.
         """
         if not request.user_input:
             yield "Please provide input for the chatbot."
             return
         
         search_started = False
+        pending = ""  # search indicator, sent together with the next text
         
         try:
             # Create full prompt using prompt service
@@ -227,7 +684,7 @@ class ChatbotService:
                 self.chatbot_name
             )
             
-            print("DEBUG: Full prompt created for agent with search.")
+            logger.debug("Full prompt created for agent with search.")
             # Get streaming response (no caching for streams)
             stream = self._get_huggingface_streaming_response_with_search(
                 full_prompt, 
@@ -235,46 +692,89 @@ class ChatbotService:
                 request.session_id
             )
 
-            print("DEBUG: Starting to stream response with search...")
+            logger.debug("Starting to stream response with search...")
             # Yield each chunk from the stream
-            for chunk in stream:
-                content = None
-                message_chunk = chunk
-                # Format 1: Dict with 'model' key (agent format)
-                if isinstance(chunk, dict) and 'model' in chunk:
-                    messages = chunk.get('model', {}).get('messages', [])
-                    if messages and hasattr(messages[0], 'content'):
-                        content = messages[0].content
-                    # Show search indicator when tools are called
-                    if hasattr(message_chunk, 'tool_calls') and message_chunk.tool_calls and not search_started:
-                        yield "\n\n🔍 *Searching the web...1*\n\n"
-                        search_started = True
-                
-                # Format 2: Dict with 'messages' key
-                elif isinstance(chunk, dict) and 'messages' in chunk:
-                    messages = chunk.get('messages', [])
-                    if messages and hasattr(messages[0], 'content'):
-                        content = messages[0].content
-                
-                     # Show search indicator when tools are called
-                    if hasattr(message_chunk, 'tool_calls') and message_chunk.tool_calls and not search_started:
-                        yield "\n\n🔍 *Searching the web...2*\n\n"
-                        search_started = True
-
-                # Format 3: Direct message object
-                elif hasattr(chunk, 'content'):
-                    content = chunk.content
-                
-                # Format 4: String
-                elif isinstance(chunk, str):
-                    content = chunk
-                
+            async for chunk in stream:
+                # Show search indicator when tools are called
+                if not search_started and _calls_tools(chunk):
+                    pending = _SEARCH_INDICATOR
+                    search_started = True
+
+                content = _extract_content(chunk)
                 if content:
-                    yield content
+                    yield pending + content
+                    pending = ""
+
+            if pending:
+                yield pending
                     
         except Exception as e:
             yield f"Error generating response with search: {str(e)}"
 
+# Example conversations for context ({chatbot_name} is filled in per chatbot)
+_EXAMPLES = (
+    (
+        "Can you introduce yourself?",
+        "Of course! I'm {chatbot_name}, your friendly AI helper. I'm here to answer your questions and assist you."
+    ),
+    (
+        "What can you do for me?", 
+        "I can answer your questions, help you brainstorm ideas, and explain concepts in simple terms."
+    ),
+    (
+        "Tell me something fun about AI.",
+        "Sure! Did you know some AIs can generate music or art, almost like human creativity?"
+    )
+)
+
+# AI personality by response type
+_SYSTEM_PROMPTS = {
+    "creative": "You are {chatbot_name}, an imaginative AI assistant. Be creative and think outside the box while responding.",
+    "factual": "You are {chatbot_name}, a precise AI assistant. Stick to verified facts only. If unsure, explicitly state that.",
+    "standard": "You are {chatbot_name}, a helpful AI assistant."
+}
+
+# Personality appended to the internet search system prompt
+_SEARCH_PERSONALITIES = {
+    "creative": "You are {chatbot_name}, an imaginative AI assistant. Be creative and think outside the box while responding.",
+    "factual": "You are {chatbot_name}, a precise AI assistant. Stick to verified facts only. Always use search tools to verify recent information.",
+    "standard": "You are {chatbot_name}, a helpful AI assistant."
+}
+
+
+# Final user turn shared by every prompt
+_USER_TEMPLATE = HumanMessagePromptTemplate.from_template("{user_input}")
+
+
+@lru_cache(maxsize=8)
+def _example_templates(chatbot_name: str) -> Tuple:
+    """Human/AI message templates for the example conversations, built once per chatbot name"""
+    messages = []
+    for human_msg, ai_msg in _EXAMPLES:
+        messages.extend([
+            HumanMessagePromptTemplate.from_template(human_msg),
+            AIMessagePromptTemplate.from_template(ai_msg.format(chatbot_name=chatbot_name))
+        ])
+    return tuple(messages)
+
+
+@lru_cache(maxsize=32)
+def _compiled_template(response_type: str, chatbot_name: str) -> ChatPromptTemplate:
+    """Build the prompt template once per personality, leaving only {user_input} unfilled"""
+    system_prompt = SystemMessagePromptTemplate.from_template(
+        _SYSTEM_PROMPTS.get(response_type, _SYSTEM_PROMPTS["standard"]).format(chatbot_name=chatbot_name)
+    )
+    return ChatPromptTemplate.from_messages([system_prompt, *_example_templates(chatbot_name), _USER_TEMPLATE])
+
+
+@lru_cache(maxsize=32)
+def _compiled_search_template(response_type: str, chatbot_name: str) -> ChatPromptTemplate:
+    """Build the search prompt template once per personality, leaving only {user_input} unfilled"""
+    personality = _SEARCH_PERSONALITIES.get(response_type, _SEARCH_PERSONALITIES["standard"])
+    system_prompt = PromptService.INTERNET_SEARCH_SYSTEM_PROMPT + "\n\n" + personality.format(chatbot_name=chatbot_name)
+    return ChatPromptTemplate.from_messages([system_prompt, *_example_templates(chatbot_name), _USER_TEMPLATE])
+
+
 class PromptService:
     """Service for handling prompt generation and formatting"""
     
@@ -327,47 +827,7 @@ When using internet search:
         if not user_input:
             return None
         
-        # Base system prompt with search capabilities
-        system_prompt = PromptService.INTERNET_SEARCH_SYSTEM_PROMPT
-        
-        # Add personality based on response type
-        if response_type == "creative":
-            system_prompt += f"\n\nYou are {chatbot_name}, an imaginative AI assistant. Be creative and think outside the box while responding."
-        elif response_type == "factual":
-            system_prompt += f"\n\nYou are {chatbot_name}, a precise AI assistant. Stick to verified facts only. Always use search tools to verify recent information."
-        else:
-            system_prompt += f"\n\nYou are {chatbot_name}, a helpful AI assistant."
-        
-        # Example conversations for context
-        examples = [
-            (
-                "Can you introduce yourself?",
-                f"Of course! I'm {chatbot_name}, your friendly AI helper. I'm here to answer your questions and assist you."
-            ),
-            (
-                "What can you do for me?", 
-                "I can answer your questions, help you brainstorm ideas, and explain concepts in simple terms."
-            ),
-            (
-                "Tell me something fun about AI.",
-                "Sure! Did you know some AIs can generate music or art, almost like human creativity?"
-            )
-        ]
-        
-        # Build message list
-        messages = [system_prompt]
-        
-        for human_msg, ai_msg in examples:
-            messages.extend([
-                HumanMessagePromptTemplate.from_template(human_msg),
-                AIMessagePromptTemplate.from_template(ai_msg)
-            ])
-        
-        messages.append(HumanMessagePromptTemplate.from_template("{user_input}"))
-        
-        # Create and format prompt
-        prompt_template = ChatPromptTemplate.from_messages(messages)
-        return prompt_template.format(chatbot_name=chatbot_name, user_input=user_input)
+        return _compiled_search_template(response_type, chatbot_name).format(user_input=user_input)
 
     @staticmethod
     def create_prompt(user_input: str, response_type: str, chatbot_name: str) -> str:
@@ -375,44 +835,4 @@ When using internet search:
         if not user_input:
             return None
             
-        # Choose the AI's personality based on response type
-        system_prompts = {
-            "creative": f"You are {chatbot_name}, an imaginative AI assistant. Be creative and think outside the box while responding.",
-            "factual": f"You are {chatbot_name}, a precise AI assistant. Stick to verified facts only. If unsure, explicitly state that.",
-            "standard": f"You are {chatbot_name}, a helpful AI assistant."
-        }
-        
-        system_prompt = SystemMessagePromptTemplate.from_template(
-            system_prompts.get(response_type, system_prompts["standard"])
-        )
-        
-        # Example conversations for context
-        examples = [
-            (
-                "Can you introduce yourself?",
-                f"Of course! I'm {chatbot_name}, your friendly AI helper. I'm here to answer your questions and assist you."
-            ),
-            (
-                "What can you do for me?", 
-                "I can answer your questions, help you brainstorm ideas, and explain concepts in simple terms."
-            ),
-            (
-                "Tell me something fun about AI.",
-                "Sure! Did you know some AIs can generate music or art, almost like human creativity?"
-            )
-        ]
-        
-        # Build message list
-        messages = [system_prompt]
-        
-        for human_msg, ai_msg in examples:
-            messages.extend([
-                HumanMessagePromptTemplate.from_template(human_msg),
-                AIMessagePromptTemplate.from_template(ai_msg)
-            ])
-        
-        messages.append(HumanMessagePromptTemplate.from_template("{user_input}"))
-        
-        # Create and format prompt
-        prompt_template = ChatPromptTemplate.from_messages(messages)
-        return prompt_template.format(chatbot_name=chatbot_name, user_input=user_input)
\ No newline at end of file
+        return _compiled_template(response_type, chatbot_name).format(user_input=user_input)
@@ -0,0 +1,183 @@
+"""
+Tests for the chatbot service: history window, pinning, summaries and caches.
+Run from 7_Chatbot_v2.2: python -m unittest discover -s test -p "test_*.py"
+"""
+import asyncio
+import time
+import unittest
+from collections import OrderedDict
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from src.chatbot import ChatbotService, ChatRequest, PromptService, WindowedChatHistory
+
+
+def exchange(index: int):
+    return [HumanMessage(content=f"question {index}"), AIMessage(content=f"answer {index}")]
+
+
+def make_service() -> ChatbotService:
+    """Service without search tools or models; tests set the parts they use"""
+    service = ChatbotService.__new__(ChatbotService)
+    service.chatbot_name = "TestBot"
+    service.repo = "test/model"
+    service.store = {}
+    service.semantic_cache = None
+    service._resp_cache = OrderedDict()
+    return service
+
+
+class WindowedChatHistoryTest(unittest.TestCase):
+
+    def test_keeps_only_the_last_turns(self):
+        history = WindowedChatHistory(max_turns=2)
+        for index in range(3):
+            history.add_messages(exchange(index))
+        self.assertEqual([m.content for m in history.messages],
+                         ["question 1", "answer 1", "question 2", "answer 2"])
+
+    def test_zero_turns_keeps_nothing(self):
+        history = WindowedChatHistory(max_turns=0)
+        history.add_messages(exchange(0))
+        self.assertEqual(history.messages, [])
+
+    def test_pins_the_exchange_of_the_full_prompt(self):
+        history = WindowedChatHistory(max_turns=1)
+        history.pin_next("full prompt", "standard")
+        history.add_messages([HumanMessage(content="full prompt"), AIMessage(content="first answer")])
+        for index in range(2):
+            history.add_messages(exchange(index))
+
+        self.assertEqual(history.pinned_for, "standard")
+        self.assertEqual([m.content for m in history.messages],
+                         ["full prompt", "first answer", "question 1", "answer 1"])
+
+    def test_pin_needs_the_same_prompt(self):
+        history = WindowedChatHistory(max_turns=2)
+        history.pin_next("full prompt", "standard")
+        history.add_messages(exchange(0))
+        self.assertEqual(history.pinned, [])
+
+        history.pin_next("full prompt", "standard")
+        history.pin_next(None)
+        history.add_messages([HumanMessage(content="full prompt"), AIMessage(content="answer")])
+        self.assertEqual(history.pinned, [])
+
+    def test_summary_is_published_on_the_next_add(self):
+        calls = []
+
+        async def summarizer(summary, evicted):
+            calls.append(len(evicted))
+            return f"{len(evicted)} messages"
+
+        history = WindowedChatHistory(max_turns=1, summarizer=summarizer)
+        for index in range(5):
+            history.add_messages(exchange(index))
+
+        deadline = time.monotonic() + 2
+        while history._next_summary is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(calls, [WindowedChatHistory.SUMMARY_BATCH])
+        # Not visible while a turn could still be running
+        self.assertNotIsInstance(history.messages[0], SystemMessage)
+
+        history.add_messages(exchange(5))
+        self.assertIsInstance(history.messages[0], SystemMessage)
+        self.assertIn("8 messages", history.messages[0].content)
+        self.assertEqual(history.messages[-1].content, "answer 5")
+
+
+class FakeModel:
+    """Chat model stand-in counting calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return AIMessage(content=f"reply {self.calls}")
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = make_service()
+        self.model = FakeModel()
+        self.service.get_huggingface_model = lambda temperature: self.model
+
+    def ask(self, text: str, temperature: float = 0.2, response_type: str = "standard") -> str:
+        request = ChatRequest(user_input=text, temperature=temperature, response_type=response_type)
+        return asyncio.run(self.service._aget_single_response(request)).message
+
+    def test_same_request_is_answered_from_the_cache(self):
+        self.assertEqual(self.ask("hello"), "reply 1")
+        self.assertEqual(self.ask("hello"), "reply 1")
+        self.assertEqual(self.model.calls, 1)
+
+    def test_key_includes_temperature_and_response_type(self):
+        self.ask("hello")
+        self.ask("hello", temperature=0.9)
+        self.ask("hello", response_type="factual")
+        self.assertEqual(self.model.calls, 3)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.service.RESPONSE_CACHE_SIZE = 2
+        self.ask("a")
+        self.ask("b")
+        self.ask("a")   # "a" is now more recent than "b"
+        self.ask("c")
+        self.ask("a")
+        self.ask("b")
+        self.assertEqual(self.model.calls, 4)
+
+
+class GetResponseStreamTest(unittest.TestCase):
+
+    def test_model_construction_errors_are_reported(self):
+        service = make_service()
+        service.get_session_history = lambda session_id: WindowedChatHistory()
+
+        def broken_chain(temperature):
+            raise RuntimeError("endpoint down")
+
+        service._history_chain = broken_chain
+        chunks = list(service.get_response_stream(ChatRequest(user_input="hello")))
+        self.assertEqual(chunks, ["Error generating response: endpoint down"])
+
+    def test_follow_up_turn_sends_only_the_user_text(self):
+        service = make_service()
+        history = WindowedChatHistory()
+        service.get_session_history = lambda session_id: history
+        full_prompt = PromptService.create_prompt("hello", "standard", service.chatbot_name)
+        history.pin_next(full_prompt, "standard")
+        history.add_messages([HumanMessage(content=full_prompt), AIMessage(content="hi")])
+
+        prompt, _ = service._prepare(ChatRequest(user_input="and then?"))
+        self.assertEqual(prompt, "and then?")
+
+
+class StreamResponsesTest(unittest.TestCase):
+
+    def test_producers_are_cancelled_when_the_consumer_stops(self):
+        cancelled = []
+
+        class SlowModel:
+            async def astream(self, prompt):
+                try:
+                    for index in range(100):
+                        await asyncio.sleep(0.01)
+                        yield AIMessage(content=str(index))
+                except asyncio.CancelledError:
+                    cancelled.append(prompt)
+                    raise
+
+        service = make_service()
+        service.get_huggingface_model = lambda temperature: SlowModel()
+        requests = [ChatRequest(user_input="hello", response_type=kind) for kind in ("standard", "creative")]
+
+        stream = service.stream_responses(requests)
+        next(stream)
+        stream.close()
+        self.assertEqual(len(cancelled), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
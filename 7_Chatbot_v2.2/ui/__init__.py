@@ -4,15 +4,30 @@ User Interface package for the Streamlit-based chatbot application.
 This package contains all UI components, styling, and presentation logic
 separated from business logic and AI services.
 """
-from .components import (
-    UIComponent,
-    PageConfigComponent, 
-    SidebarComponent,
-    ChatInterface,
-    # ErrorDisplayComponent,
-    # MetricsDisplayComponent,
-    # SettingsPanel
-)
+import functools
+import importlib
+
+# Component classes are imported from .components on first access (PEP 562),
+# so `import ui` does not pull in Streamlit and LangChain by itself
+_LAZY = {
+    'UIComponent',
+    'PageConfigComponent',
+    'SidebarComponent',
+    'ChatInterface',
+    # 'ErrorDisplayComponent',
+    # 'MetricsDisplayComponent',
+    # 'SettingsPanel'
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module('.components', __name__), name)
+        globals()[name] = value
+        return value
+    if name == 'COMPONENT_REGISTRY':
+        return _registry()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __version__ = "1.0.0"
 
@@ -43,14 +58,19 @@ DEFAULT_LAYOUT = "wide"
 SUPPORTED_LAYOUTS = ["centered", "wide"]
 
 # Component registration for dynamic loading
-COMPONENT_REGISTRY = {
-    "page_config": PageConfigComponent,
-    "sidebar": SidebarComponent,
-    "chat_interface": ChatInterface
-    # "error_display": ErrorDisplayComponent,
-    # "metrics_display": MetricsDisplayComponent,
-    # "settings_panel": SettingsPanel
-}
+@functools.cache
+def _registry() -> dict:
+    """Component classes by name, built on first use"""
+    from .components import PageConfigComponent, SidebarComponent, ChatInterface
+
+    return {
+        "page_config": PageConfigComponent,
+        "sidebar": SidebarComponent,
+        "chat_interface": ChatInterface
+        # "error_display": ErrorDisplayComponent,
+        # "metrics_display": MetricsDisplayComponent,
+        # "settings_panel": SettingsPanel
+    }
 
 def get_component(component_name: str):
     """
@@ -66,7 +86,7 @@ def get_component(component_name: str):
         >>> ChatComponent = get_component("chat_interface")
         >>> chat = ChatComponent(service, manager)
     """
-    return COMPONENT_REGISTRY.get(component_name.lower())
+    return _registry().get(component_name.lower())
 
 def list_components():
     """
@@ -80,7 +100,7 @@ def list_components():
         >>> print(components)
         ['page_config', 'sidebar', 'chat_interface', ...]
     """
-    return list(COMPONENT_REGISTRY.keys())
+    return list(_registry().keys())
 
 def validate_theme(theme: str) -> bool:
     """
@@ -165,6 +185,8 @@ def create_ui_components(chatbot_service, conversation_manager, config=None):
         >>> sidebar = components['sidebar']
         >>> chat_interface = components['chat_interface']
     """
+    from .components import PageConfigComponent, SidebarComponent, ChatInterface
+
     config = config or {}
     
     components = {
@@ -1,11 +1,18 @@
 """
 Pure Streamlit UI components with no AI logic
 """
+import logging
+import time
 import streamlit as st
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from src import ChatbotService, ChatRequest, ConversationManager
 
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between redraws of a streaming response
+RENDER_INTERVAL = 0.1
+
 
 class UIComponent(ABC):
     """Base class for all UI components"""
@@ -35,20 +42,24 @@ class PageConfigComponent(UIComponent):
         
         st.set_page_config(page_title=page_title, layout=layout)
 
-        html_code = f"""
-            <div style='display: flex; justify-content: center; align-items: center; height: 80vh;'>
-                <h2>{app_message}</h2>
-            </div>
-        """
-        st.markdown(html_code, unsafe_allow_html=True)
+        # Show the full-height welcome banner on the first run only, not on every rerun
+        if "page_configured" not in st.session_state:
+            st.session_state.page_configured = True
+            html_code = f"""
+                <div style='display: flex; justify-content: center; align-items: center; height: 80vh;'>
+                    <h2>{app_message}</h2>
+                </div>
+            """
+            st.markdown(html_code, unsafe_allow_html=True)
 
 class SidebarComponent(UIComponent):
     """Renders sidebar controls"""
     
-    def __init__(self, config: Dict[str, Any], conversation_manager: ConversationManager):
+    def __init__(self, config: Dict[str, Any], conversation_manager: ConversationManager,
+                 chatbot_service: Optional[ChatbotService] = None):
         self.config = config
         self.conversation_manager = conversation_manager
-        super().__init__(None, conversation_manager)
+        super().__init__(chatbot_service, conversation_manager)
 
     def render(self):
         """Render enhanced sidebar with collapsible sections and controls"""
@@ -77,6 +88,9 @@ class SidebarComponent(UIComponent):
             # Clear conversation button
             if st.button("Clear Conversation", type="secondary"):
                 self.conversation_manager.clear_conversation()
+                # The service outlives reruns, so its history for this session is dropped too
+                if self.chatbot_service is not None:
+                    self.chatbot_service.clear_session(self.conversation_manager.session_id)
                 if 'messages' in st.session_state:
                     st.session_state.messages = []
                 st.rerun()
@@ -134,7 +148,7 @@ class ChatInterface(UIComponent):
     def _generate_and_display_streaming_response(self, user_input: str, response_type: str):
         """Generate response from AI service and display with streaming"""
         try:   
-            print(f"_generate_and_display_streaming_response::Response type set to: {response_type}")
+            logger.debug("Response type: %s", response_type)
             if response_type == 'standard':
                 temp = self.standard_temperature
             elif response_type == 'creative':
@@ -144,7 +158,7 @@ class ChatInterface(UIComponent):
             else:
                 temp = self.default_temperature  # default
             
-            print(f"_generate_and_display_streaming_response::Response type set to: {temp}")
+            logger.debug("Temperature: %s", temp)
 
             # Create request
             request = ChatRequest(
@@ -156,15 +170,26 @@ class ChatInterface(UIComponent):
             
             if self.use_search:
                 # Use search-enabled response
-                print("_generate_and_display_streaming_response::Using search-enabled response generation.")
+                logger.debug("Using search-enabled response generation")
                 response_generator = self.chatbot_service.get_response_with_search(request)
             else:
                 # Get streaming response using the new method
-                print("_generate_and_display_streaming_response::Using standard streaming response generation.")
+                logger.debug("Using standard streaming response generation")
                 response_generator = self.chatbot_service.get_response_stream(request)
             
-            # Stream the response using st.write_stream
-            response_content = st.write_stream(response_generator)
+            # Stream the response; chunks are collected in a list and the placeholder
+            # is redrawn at most every RENDER_INTERVAL seconds, so the join is not per chunk
+            placeholder = st.empty()
+            chunks = []
+            last_render = 0.0
+            for chunk in response_generator:
+                chunks.append(chunk)
+                now = time.monotonic()
+                if now - last_render >= RENDER_INTERVAL:
+                    placeholder.markdown("".join(chunks))
+                    last_render = now
+            response_content = "".join(chunks)
+            placeholder.markdown(response_content)
             
             # Add to session state and conversation manager
             st.session_state.messages.append({"role": "assistant", "content": response_content})